@@ -0,0 +1,78 @@
+"""Compare the payload codec with the generic humps conversion it replaced.
+
+    python benchmarks/bench_codec.py [--remotes 100 1000 5000]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import humps
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components" / "switchbotremote"))
+
+from client.codec import decode_remote_list, decode_response, encode_command  # noqa: E402
+
+
+def device_list_response(remotes: int) -> str:
+    return json.dumps({
+        "statusCode": 100,
+        "message": "success",
+        "body": {
+            "deviceList": [
+                {"deviceId": f"HUB{hub:04d}", "deviceName": f"Hub {hub}", "deviceType": "Hub Mini", "enableCloudService": True, "hubDeviceId": "000000000000"}
+                for hub in range(max(remotes // 20, 1))
+            ],
+            "infraredRemoteList": [
+                {"deviceId": f"02-{index:08d}", "deviceName": f"Remote {index}", "remoteType": "DIY Air Conditioner", "hubDeviceId": f"HUB{index % max(remotes // 20, 1):04d}"}
+                for index in range(remotes)
+            ],
+        },
+    })
+
+
+def humps_decode(text: str):
+    response = humps.decamelize(json.loads(text))
+    return [
+        (remote["device_id"], remote["device_name"], remote["remote_type"], remote["hub_device_id"])
+        for remote in response["body"]["infrared_remote_list"]
+    ]
+
+
+def codec_decode(text: str):
+    return decode_remote_list(decode_response(text)["body"])
+
+
+def humps_encode():
+    return humps.camelize({"command_type": "command", "command": "setAll", "parameter": "26,2,1,on"})
+
+
+def codec_encode():
+    return encode_command("setAll", "26,2,1,on")
+
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--remotes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'humps':>12}{'codec':>12}{'speedup':>10}")
+    for remotes in args.remotes:
+        text = device_list_response(remotes)
+        number = max(10000 // remotes, 3)
+        before = best_of(lambda: humps_decode(text), number)
+        after = best_of(lambda: codec_decode(text), number)
+        print(f"{f'GET devices, {remotes} remotes':<28}{before * 1e3:>10.3f}ms{after * 1e3:>10.3f}ms{before / after:>9.1f}x")
+
+    before = best_of(humps_encode, 20000)
+    after = best_of(codec_encode, 20000)
+    print(f"{'command payload':<28}{before * 1e6:>10.2f}us{after * 1e6:>10.2f}us{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Measure the command path against a local stand-in of the SwitchBot cloud.
+
+Each case sends `--commands` commands, `--concurrency` at a time, spread over
+`--remotes` remotes on `--hubs` hubs, and reports throughput, p50/p99 latency,
+executor threads in use and peak traced memory. The blocking cases run in a
+thread pool the way Home Assistant runs them in its executor.
+
+    python benchmarks/bench_commands.py [--latency-ms 20] [--json results.json]
+    python benchmarks/bench_commands.py --baseline results.json
+
+Memory includes the share of the stand-in server, which is the same from one
+version to the next. Commands to the same hub are still spaced by
+`--command-gap` ms, 0 by default to measure the client alone, and the async
+client keeps at most `--max-concurrency` calls in flight.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import aiohttp  # noqa: E402
+
+from benchmarks.fake_api import FakeSwitchBotApi  # noqa: E402
+from custom_components.switchbotremote.client import SwitchBot, __version__ as client_version  # noqa: E402
+from custom_components.switchbotremote.client.concurrency import DEFAULT_MAX_CONCURRENCY, ConcurrencyLimit  # noqa: E402
+from custom_components.switchbotremote.client.remote import Remote  # noqa: E402
+
+MANIFEST = Path(__file__).resolve().parents[1] / "custom_components" / "switchbotremote" / "manifest.json"
+
+# Remote type, and how an entity of each platform sends its i-th command.
+PLATFORMS = {
+    "climate": ("Air Conditioner", lambda entity, i: entity.async_set_hvac_mode("cool" if i % 2 else "heat")),
+    "fan": ("Fan", lambda entity, i: entity.async_turn_on() if i % 2 else entity.async_turn_off()),
+    "light": ("Light", lambda entity, i: entity.async_turn_on() if i % 2 else entity.async_turn_off()),
+    "media_player": ("TV", lambda entity, i: entity.async_volume_up()),
+    "vacuum": ("Vacuum Cleaner", lambda entity, i: entity.async_start()),
+    "water_heater": ("Water Heater", lambda entity, i: entity.async_turn_on() if i % 2 else entity.async_turn_off()),
+    "remote": ("Others", lambda entity, i: entity.async_turn_on()),
+    "button": ("Others", lambda entity, i: entity.async_press()),
+}
+
+
+def percentile_ms(latencies: List[float], q: float) -> float:
+    ordered = sorted(latencies)
+    return round(ordered[min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)] * 1000, 2)
+
+
+# Executor threads that ran a command during the current case.
+used_threads: Set[int] = set()
+
+
+def in_executor(func: Callable[..., Any]) -> Callable[..., Any]:
+    def call(*args):
+        used_threads.add(threading.get_ident())
+        return func(*args)
+    return call
+
+
+async def run_case(name: str, send: Callable[[int], Awaitable[Any]], commands: int, concurrency: int, memory: bool) -> Dict[str, Any]:
+    latencies: List[float] = []
+    queue = iter(range(commands))
+    used_threads.clear()
+
+    async def worker():
+        for index in queue:
+            start = time.perf_counter()
+            await send(index)
+            latencies.append(time.perf_counter() - start)
+
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "commands": commands,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "throughput_per_s": round(commands / elapsed, 1),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+        "executor_threads": len(used_threads),
+        "peak_memory_kib": None if peak is None else round(peak / 1024),
+    }
+
+
+def create_entity(platform_name: str, remote: Remote):
+    """Build the entity of `platform_name` for `remote`, detached from Home Assistant."""
+    from custom_components.switchbotremote.const import CONF_DEBOUNCE, CONF_ON_COMMAND
+
+    if platform_name == "climate":
+        from custom_components.switchbotremote.climate import SwitchBotRemoteClimate
+        entity = SwitchBotRemoteClimate(remote, {CONF_DEBOUNCE: 0})
+    elif platform_name == "fan":
+        from custom_components.switchbotremote.fan import SwitchBotRemoteFan
+        entity = SwitchBotRemoteFan(None, remote, {})
+    elif platform_name == "light":
+        from custom_components.switchbotremote.light import SwitchBotRemoteLight
+        entity = SwitchBotRemoteLight(None, remote, {})
+    elif platform_name == "media_player":
+        from custom_components.switchbotremote.media_player import SwitchbotRemoteMediaPlayer
+        entity = SwitchbotRemoteMediaPlayer(None, remote, {})
+    elif platform_name == "vacuum":
+        from custom_components.switchbotremote.vacuum import SwitchBotRemoteVacuum
+        entity = SwitchBotRemoteVacuum(None, remote, {})
+    elif platform_name == "water_heater":
+        from custom_components.switchbotremote.water_heater import SwitchBotRemoteWaterHeater
+        entity = SwitchBotRemoteWaterHeater(remote, {})
+    elif platform_name == "remote":
+        from custom_components.switchbotremote.remote import SwitchBotRemoteOther
+        entity = SwitchBotRemoteOther(remote, {CONF_ON_COMMAND: "power"})
+    else:
+        from custom_components.switchbotremote.button import SwitchBotRemoteButton
+        entity = SwitchBotRemoteButton(None, remote, "power", "mdi:power")
+
+    entity.entity_id = f"{platform_name}.bench_{remote.id.replace('-', '_').lower()}"
+    # No state machine to write to, only the command path is measured.
+    entity.async_write_ha_state = lambda: None
+    return entity
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    remote_types = sorted({remote_type for remote_type, _ in PLATFORMS.values()})
+    api = FakeSwitchBotApi(
+        remotes=args.remotes * len(remote_types),
+        hubs=args.hubs,
+        remote_types=remote_types,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+    )
+    host = api.start_in_thread()
+    results = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            switchbot = SwitchBot(
+                "token",
+                "secret",
+                host=host,
+                session=session,
+                command_gap_ms=args.command_gap,
+                dedup_window_s=0,
+                concurrency_limit=ConcurrencyLimit(size=args.max_concurrency, max_queue=args.commands),
+            )
+            remotes = await switchbot.async_remotes()
+            others = [remote for remote in remotes if remote.type == "Others"]
+            payload = {"commandType": "command", "command": "volumeAdd", "parameter": "default"}
+
+            def path(index: int) -> str:
+                return f"devices/{others[index % len(others)].id}/commands"
+
+            def post(index: int):
+                return switchbot.client.post(path(index), json=payload)
+
+            def command(index: int):
+                return others[index % len(others)].command("volumeAdd")
+
+            def platform_case(platform_name: str, remote_type: str, send: Callable[[Any, int], Awaitable[Any]]):
+                def build():
+                    entities = [create_entity(platform_name, remote) for remote in remotes if remote.type == remote_type]
+                    return lambda i: send(entities[i % len(entities)], i)
+                return build
+
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                loop = asyncio.get_running_loop()
+                # Each case builds the function sending its i-th command.
+                cases: Dict[str, Callable[[], Callable[[int], Awaitable[Any]]]] = {
+                    "SwitchBotClient.post": lambda: lambda i: loop.run_in_executor(executor, in_executor(post), i),
+                    "AsyncSwitchBotClient.post": lambda: lambda i: switchbot.async_client.post(path(i), json=payload),
+                    "Remote.command": lambda: lambda i: loop.run_in_executor(executor, in_executor(command), i),
+                    "Remote.async_command": lambda: lambda i: others[i % len(others)].async_command("volumeAdd"),
+                }
+                for platform_name, (remote_type, send) in PLATFORMS.items():
+                    cases[f"{platform_name} entity"] = platform_case(platform_name, remote_type, send)
+
+                for name, build in cases.items():
+                    if args.cases and not any(case.lower() in name.lower() for case in args.cases):
+                        continue
+                    send = build()
+                    await run_case(name, send, min(args.concurrency * 2, args.commands), args.concurrency, False)
+                    result = await run_case(name, send, args.commands, args.concurrency, False)
+                    if args.memory:
+                        result["peak_memory_kib"] = (await run_case(name, send, args.commands, args.concurrency, True))["peak_memory_kib"]
+                    results.append(result)
+                    print_result(result, args.baseline.get(name) if args.baseline else None)
+    finally:
+        api.stop_in_thread()
+    return results
+
+
+def print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    line = (
+        f"{result['name']:<28}{result['throughput_per_s']:>10.1f}/s{result['p50_ms']:>10.2f}ms{result['p99_ms']:>10.2f}ms"
+        f"{result['executor_threads']:>9}{result['peak_memory_kib'] if result['peak_memory_kib'] is not None else '-':>10}"
+    )
+    if baseline is not None:
+        line += f"{result['throughput_per_s'] / baseline['throughput_per_s']:>9.2f}x"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--remotes", type=int, default=4, help="remotes of each type")
+    parser.add_argument("--hubs", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--command-gap", type=int, default=0)
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="calls in flight at once in the async client")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the traced memory pass")
+    parser.add_argument("--cases", nargs="+", help="only run the cases whose name contains one of these")
+    parser.add_argument("--json", help="write the results to this file, - for stdout")
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare the throughput with")
+    args = parser.parse_args()
+    if args.baseline:
+        args.baseline = {case["name"]: case for case in json.loads(args.baseline.read_text())["cases"]}
+
+    header = f"{'case':<28}{'throughput':>12}{'p50':>12}{'p99':>12}{'threads':>9}{'mem KiB':>10}"
+    print(header + (f"{'vs base':>10}" if args.baseline else ""))
+    results = asyncio.run(run(args))
+
+    report = {
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "client_version": client_version,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": {
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "hubs": args.hubs,
+            "remotes_per_type": args.remotes,
+            "command_gap_ms": args.command_gap,
+            "max_concurrency": args.max_concurrency,
+        },
+        "cases": results,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
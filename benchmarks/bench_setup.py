@@ -0,0 +1,158 @@
+"""Measure entry setup, reload and unload for accounts of growing size.
+
+For each size a synthetic account is served by the local stand-in API, then
+set up, reloaded and unloaded in a test Home Assistant instance. The first
+setup has no saved device list: it fetches the devices, then its background
+refresh brings the scenes and reloads the entry once. The reload starts from
+the saved lists, as after a restart.
+
+The report gives the wall time of each step, the peak traced memory of the
+setup and the entities created, and how each grows with the number of
+remotes: an exponent of 1 is linear, 2 quadratic.
+
+Needs Home Assistant 2025.1 or later and its test helpers, which need
+Python 3.13:
+
+    pip install pytest-homeassistant-custom-component pyhumps
+    python benchmarks/bench_setup.py [--sizes 10 100 1000 5000] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from aiohttp import ThreadedResolver
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# homeassistant.core first, importing the loader alone is circular.
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant import loader  # noqa: E402
+from homeassistant.helpers import aiohttp_client, entity_registry as er, frame  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant  # noqa: E402
+
+from benchmarks.fake_api import FakeSwitchBotApi  # noqa: E402
+from custom_components.switchbotremote.const import CLASS_BY_TYPE, CONF_CUSTOMIZE_COMMANDS, DOMAIN  # noqa: E402
+
+MEASURES = ("setup_s", "reload_s", "unload_s", "peak_memory_kib", "entities")
+
+
+async def timed(hass: HomeAssistant, step) -> float:
+    """Run `step` and wait for the tasks it started, the device list refresh
+    included, return the wall time."""
+    start = time.perf_counter()
+    await step
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return round(time.perf_counter() - start, 4)
+
+
+async def measure(hass: HomeAssistant, size: int, args) -> Dict[str, Any]:
+    api = FakeSwitchBotApi(
+        remotes=size,
+        hubs=max(size // args.remotes_per_hub, 1),
+        remote_types=list(CLASS_BY_TYPE),
+        scenes=args.scenes,
+        latency_ms=args.latency_ms,
+    )
+    host = await api.start()
+    data = {"name": f"Bench {size}", "token": "token", "secret": "secret", "host": host}
+    for remote in api.remotes:
+        data[remote["deviceId"]] = {CONF_CUSTOMIZE_COMMANDS: [f"Key {key}" for key in range(args.buttons)]}
+
+    entry = MockConfigEntry(domain=DOMAIN, title=data["name"], data=data)
+    entry.add_to_hass(hass)
+    try:
+        setup_s = await timed(hass, hass.config_entries.async_setup(entry.entry_id))
+        entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        states = sum(1 for entity in entities if hass.states.get(entity.entity_id) is not None)
+        reload_s = await timed(hass, hass.config_entries.async_reload(entry.entry_id))
+        unload_s = await timed(hass, hass.config_entries.async_unload(entry.entry_id))
+
+        # Traced separately, tracemalloc slows everything down.
+        tracemalloc.start()
+        await timed(hass, hass.config_entries.async_setup(entry.entry_id))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        await timed(hass, hass.config_entries.async_unload(entry.entry_id))
+    finally:
+        await hass.config_entries.async_remove(entry.entry_id)
+        await api.stop()
+
+    return {
+        "remotes": size,
+        "hubs": api.hubs,
+        "setup_s": setup_s,
+        "reload_s": reload_s,
+        "unload_s": unload_s,
+        "peak_memory_kib": round(peak / 1024),
+        "entities": len(entities),
+        "states": states,
+        "api_calls": api.calls,
+    }
+
+
+def scaling(results: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Return, for each measure, the growth exponent between consecutive sizes."""
+    exponents = {}
+    for measure in MEASURES:
+        exponents[measure] = [
+            round(math.log(after[measure] / before[measure]) / math.log(after["remotes"] / before["remotes"]), 2)
+            if before[measure] > 0 and after[measure] > 0 else None
+            for before, after in zip(results, results[1:])
+        ]
+    return exponents
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    results = []
+    # The shared session resolves through zeroconf, which the test instance
+    # does not set up. The stand-in API needs no more than the system resolver.
+    with patch.object(aiohttp_client, "_async_make_resolver", lambda hass: ThreadedResolver(), create=True):
+        async with async_test_home_assistant() as hass:
+            # As the hass fixture does, deprecation reports need it.
+            frame.async_setup(hass)
+            # Let the loader find the integration in this repository.
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            for size in args.sizes:
+                result = await measure(hass, size, args)
+                results.append(result)
+                print(
+                    f"{result['remotes']:>8}{result['entities']:>10}{result['states']:>8}{result['setup_s']:>10.3f}s"
+                    f"{result['reload_s']:>10.3f}s{result['unload_s']:>10.3f}s{result['peak_memory_kib']:>12}",
+                    flush=True,
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--remotes-per-hub", type=int, default=20)
+    parser.add_argument("--buttons", type=int, default=2, help="custom command buttons of each remote")
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--json", help="write the results to this file, - for stdout")
+    args = parser.parse_args()
+
+    print(f"{'remotes':>8}{'entities':>10}{'states':>8}{'setup':>11}{'reload':>11}{'unload':>11}{'peak KiB':>12}")
+    results = asyncio.run(run(args))
+    exponents = scaling(results)
+    print(f"{'growth':<16}" + "".join(f"{f'{before}>{after}':>12}" for before, after in zip(args.sizes, args.sizes[1:])))
+    for measure, values in exponents.items():
+        print(f"{measure:<16}" + "".join(f"{'-' if value is None else value:>12}" for value in values))
+
+    report = {"settings": vars(args), "results": results, "scaling": exponents}
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
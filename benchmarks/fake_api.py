@@ -0,0 +1,146 @@
+"""In-process stand-in for the SwitchBot v1.1 cloud API, used by the benchmarks.
+
+Point the client at `api.host` instead of https://api.switch-bot.com. Each
+call answers after `latency_ms` plus up to `jitter_ms` of random delay.
+
+    api = FakeSwitchBotApi(remotes=100, hubs=10, latency_ms=50)
+    host = api.start_in_thread()
+    ...
+    api.stop_in_thread()
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from typing import List, Optional, Sequence
+
+from aiohttp import web
+
+OK = {"statusCode": 100, "message": "success", "body": {}}
+
+
+class FakeSwitchBotApi:
+    def __init__(
+        self,
+        remotes: int = 10,
+        hubs: int = 1,
+        remote_types: Sequence[str] = ("Others",),
+        scenes: int = 0,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        seed: int = 0,
+    ):
+        self.remote_types = list(remote_types)
+        self.hubs = max(hubs, 1)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+        self.commands = 0
+
+        self._random = random.Random(seed)
+        self._remotes = [
+            {
+                "deviceId": f"02-{index:08d}",
+                "deviceName": f"Remote {index}",
+                "remoteType": self.remote_types[index % len(self.remote_types)],
+                "hubDeviceId": self.hub_id(index % self.hubs),
+            }
+            for index in range(remotes)
+        ]
+        self._device_list = {
+            **OK,
+            "body": {
+                "deviceList": [
+                    {"deviceId": self.hub_id(hub), "deviceName": f"Hub {hub}", "deviceType": "Hub Mini", "enableCloudService": True, "hubDeviceId": "000000000000"}
+                    for hub in range(self.hubs)
+                ],
+                "infraredRemoteList": self._remotes,
+            },
+        }
+        self._scene_list = {**OK, "body": [{"sceneId": f"S{index:04d}", "sceneName": f"Scene {index}"} for index in range(scenes)]}
+        self._known = {remote["deviceId"] for remote in self._remotes}
+
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.host: Optional[str] = None
+
+    @staticmethod
+    def hub_id(hub: int) -> str:
+        return f"HUB{hub:08d}"
+
+    @property
+    def remotes(self) -> List[dict]:
+        return self._remotes
+
+    async def _delay(self):
+        self.calls += 1
+        delay_ms = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(self._device_list)
+
+    async def _command(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if request.match_info["device_id"] not in self._known:
+            return web.json_response({"statusCode": 152, "message": "device not found", "body": {}})
+        await request.read()
+        self.commands += 1
+        return web.json_response(OK)
+
+    async def _scenes(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(self._scene_list)
+
+    async def _execute(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(OK)
+
+    async def start(self) -> str:
+        """Serve on a free local port of the running loop, return the host to give the client."""
+        app = web.Application()
+        app.router.add_get("/v1.1/devices", self._devices)
+        app.router.add_post("/v1.1/devices/{device_id}/commands", self._command)
+        app.router.add_get("/v1.1/scenes", self._scenes)
+        app.router.add_post("/v1.1/scenes/{scene_id}/execute", self._execute)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, backlog=1024)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.host = f"http://127.0.0.1:{port}"
+        return self.host
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self) -> str:
+        """Serve from a loop of its own in a daemon thread, so blocking clients can call it too."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake-switchbot-api", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.host
+
+    def stop_in_thread(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
@@ -1,16 +1,56 @@
 """The SwitchBot Remote IR integration."""
 from __future__ import annotations
 
+import json
 import logging
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from .client import SwitchBot, switchbot_host
+from .client.catalog import DeviceCatalog
+from .client.remote import Remote
 
-from .const import DOMAIN
+from .client.concurrency import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_QUEUE, ConcurrencyLimit
+from .client.dedup import DEFAULT_DEDUP_WINDOW_S
+from .client.dispatcher import DEFAULT_COMMAND_GAP_MS
+from .client.hedge import DEFAULT_HEDGE_BUDGET_PERCENT, HedgeBudget
+from .client.ratelimit import DEFAULT_DAILY_QUOTA, DEFAULT_QUOTA_RESERVE_PERCENT, Priority, RateLimiter
+from .client.retry import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BUDGET_S, RetryPolicy
+from .client.timeouts import DEFAULT_COMMAND_TIMEOUT_S, DEFAULT_MAX_READ_TIMEOUT_S, DEFAULT_MIN_READ_TIMEOUT_S, AdaptiveTimeout
+from .client.tracing import Trace, Tracer
+from .const import (
+    DOMAIN,
+    CONF_COMMAND_GAP,
+    CONF_DAILY_QUOTA,
+    CONF_DEDUP_WINDOW,
+    CONF_HEDGE_BUDGET,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_QUEUE,
+    CONF_QUOTA_RESERVE,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RETRY_BUDGET,
+    CONF_TIMEOUT_MAX,
+    CONF_COMMAND_TIMEOUT,
+    CONF_TIMEOUT_MIN,
+    CONF_TRACE,
+    EVENT_TRACE,
+    TRACE_EVENT,
+    TRACE_FILE,
+    TRACE_FILENAME,
+)
 from homeassistant.helpers import (
+    config_validation as cv,
     device_registry as dr,
 )
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [
     Platform.CLIMATE,
@@ -21,10 +61,84 @@ PLATFORMS: list[Platform] = [
     Platform.VACUUM,
     Platform.REMOTE,
     Platform.WATER_HEATER,
+    Platform.SENSOR,
+    Platform.SCENE,
 ]
 
+STORAGE_VERSION = 1
+QUOTA_SAVE_DELAY = 30
+
+# Device lists fetched while validating credentials, picked up by the entry setup.
+DATA_VALIDATED_DEVICES = "validated_devices"
+
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+@dataclass
+class SwitchBotRemoteData:
+    """Runtime data of a config entry."""
+
+    switchbot: SwitchBot
+    remotes: list[Remote]
+    quota_store: Store
+    devices_store: Store
+
+
+@callback
+def async_get_switchbot(hass: HomeAssistant, data: Mapping[str, Any], entry_id: str | None = None) -> SwitchBot:
+    """Return the client of a loaded config entry, or a new one for the given credentials."""
+    if entry_id is not None and (entry_data := hass.data.get(DOMAIN, {}).get(entry_id)) is not None:
+        return entry_data.switchbot
+
+    return SwitchBot(
+        token=data["token"],
+        secret=data["secret"],
+        host=data.get("host", switchbot_host),
+        session=async_get_clientsession(hass),
+    )
+
+
+@callback
+def async_keep_validated_devices(hass: HomeAssistant, data: Mapping[str, Any], catalog: DeviceCatalog):
+    """Keep the device list fetched to validate credentials for the entry setup that follows.
+    It is dropped once stale, when the flow was abandoned or the setup did not pick it up."""
+    validated = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_VALIDATED_DEVICES, {})
+    key = (data.get("host", switchbot_host), data["token"])
+    validated[key] = catalog
+
+    @callback
+    def expire(_now):
+        if validated.get(key) is catalog:
+            del validated[key]
+
+    async_call_later(hass, catalog.ttl_s, expire)
+
+
+@callback
+def async_trace_export(hass: HomeAssistant, mode: str | None) -> Callable[[Trace], None] | None:
+    """Return how to export the command traces for the trace setting `mode`, None when off."""
+    if mode == TRACE_EVENT:
+        return lambda trace: hass.bus.async_fire(EVENT_TRACE, trace.as_dict())
+
+    if mode == TRACE_FILE:
+        path = hass.config.path(TRACE_FILENAME)
+
+        def write(line: str):
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+        return lambda trace: hass.async_add_executor_job(write, json.dumps(trace.as_dict()))
+
+    return None
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the SwitchBot Remote IR services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up SwitchBot Remote IR from a config entry."""
@@ -32,15 +146,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     entry.add_update_listener(update_listener)
 
+    rate_limiter = RateLimiter(
+        daily_quota=entry.data.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA),
+        reserve_percent=entry.data.get(CONF_QUOTA_RESERVE, DEFAULT_QUOTA_RESERVE_PERCENT),
+    )
+    quota_store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.quota")
+    rate_limiter.restore(await quota_store.async_load())
+    entry.async_on_unload(rate_limiter.add_listener(
+        lambda: quota_store.async_delay_save(rate_limiter.as_dict, QUOTA_SAVE_DELAY)
+    ))
+
     switchbot = SwitchBot(
         token=entry.data["token"], 
         secret=entry.data["secret"], 
-        host=entry.data.get("host", switchbot_host)
+        host=entry.data.get("host", switchbot_host),
+        session=async_get_clientsession(hass),
+        command_gap_ms=entry.data.get(CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP_MS),
+        rate_limiter=rate_limiter,
+        retry_policy=RetryPolicy(
+            max_attempts=entry.data.get(CONF_RETRY_ATTEMPTS, DEFAULT_MAX_ATTEMPTS),
+            budget_s=entry.data.get(CONF_RETRY_BUDGET, DEFAULT_RETRY_BUDGET_S),
+        ),
+        dedup_window_s=entry.data.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW_S),
+        timeout=AdaptiveTimeout(
+            min_read_s=entry.data.get(CONF_TIMEOUT_MIN, DEFAULT_MIN_READ_TIMEOUT_S),
+            max_read_s=entry.data.get(CONF_TIMEOUT_MAX, DEFAULT_MAX_READ_TIMEOUT_S),
+            command_s=entry.data.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT_S),
+        ),
+        concurrency_limit=ConcurrencyLimit(
+            size=entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            max_queue=entry.data.get(CONF_MAX_QUEUE, DEFAULT_MAX_QUEUE),
+        ),
+        hedge_budget=HedgeBudget(entry.data.get(CONF_HEDGE_BUDGET, DEFAULT_HEDGE_BUDGET_PERCENT)),
+        tracer=Tracer(async_trace_export(hass, entry.data.get(CONF_TRACE))),
     )
-    remotes = await hass.async_add_executor_job(switchbot.remotes)
+    entry.async_on_unload(switchbot.dispatcher.cancel)
+    entry.async_on_unload(switchbot.async_client.circuit_breaker.cancel)
+
+    # Build the entities from the last known device and scene lists when there
+    # are some, the cloud is then only asked in the background.
+    devices_store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.devices")
+    snapshot = await devices_store.async_load()
+    if snapshot is not None:
+        remotes = switchbot.restore_remotes(snapshot["remotes"])
+    elif (
+        validated := hass.data[DOMAIN].get(DATA_VALIDATED_DEVICES, {}).pop(
+            (entry.data.get("host", switchbot_host), entry.data["token"]), None
+        )
+    ) is not None and validated.fresh:
+        remotes = switchbot.restore_remotes([remote.as_dict() for remote in validated.remotes], fresh=True)
+        snapshot = {"remotes": [remote.as_dict() for remote in remotes], "scenes": []}
+        await devices_store.async_save(snapshot)
+    else:
+        try:
+            remotes = await switchbot.async_remotes()
+        except HomeAssistantError as err:
+            raise ConfigEntryNotReady(f"Unable to fetch the SwitchBot device list: {err}") from err
+        snapshot = {"remotes": [remote.as_dict() for remote in remotes], "scenes": []}
+        await devices_store.async_save(snapshot)
+
+    # Scenes are not needed to set the entry up, the first ones come with the
+    # background refresh.
+    switchbot.restore_scenes(snapshot.get("scenes", []))
 
-    _LOGGER.debug(f"Configuring remotes: {remotes}")
-    hass.data[DOMAIN][entry.entry_id] = remotes
+    _LOGGER.debug("Configuring remotes: %s", remotes)
+    hass.data[DOMAIN][entry.entry_id] = SwitchBotRemoteData(switchbot, remotes, quota_store, devices_store)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -49,14 +219,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         device_registry, entry.entry_id
     ):
         device_id = list(device_entry.identifiers)[0][1]
-        registered = next((remote for remote in remotes if remote.id == device_id), None)
+        if device_id == entry.entry_id:
+            continue
 
-        if not registered:
+        if switchbot.catalog.get(device_id) is None:
             device_registry.async_remove_device(device_entry.id)
 
+    # Started last, a reload scheduled while the entry is still being set up
+    # would fail.
+    entry.async_create_background_task(
+        hass,
+        async_reconcile_devices(hass, entry, switchbot, devices_store, snapshot),
+        f"{DOMAIN} {entry.title} device list refresh",
+    )
+
     return True
 
 
+async def async_reconcile_devices(hass: HomeAssistant, entry: ConfigEntry, switchbot: SwitchBot, devices_store: Store, known: dict[str, list[dict]]):
+    """Refresh the device and scene lists from the cloud and reload the entry if they changed.
+    A device list fetched during the setup is not fetched again."""
+    try:
+        remotes = await switchbot.async_remotes(priority=Priority.LOW)
+        scenes = await switchbot.async_fetch_scenes(priority=Priority.LOW)
+    except HomeAssistantError as err:
+        _LOGGER.warning(f"Unable to refresh the SwitchBot device list, keeping the saved one: {err}")
+        return
+
+    snapshot = {
+        "remotes": [remote.as_dict() for remote in remotes],
+        "scenes": [scene.as_dict() for scene in scenes],
+    }
+    changed_remotes = _changed_ids(known["remotes"], snapshot["remotes"], "device_id")
+    changed_scenes = _changed_ids(known.get("scenes", []), snapshot["scenes"], "scene_id")
+    if not changed_remotes and not changed_scenes:
+        return
+
+    _LOGGER.info("SwitchBot device list changed, reloading")
+    _LOGGER.debug("Changed remotes: %s, changed scenes: %s", changed_remotes, changed_scenes)
+    await devices_store.async_save(snapshot)
+    hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+def _changed_ids(known: list[dict], current: list[dict], id_key: str) -> list[str]:
+    """Return the ids added, removed or changed between two lists, whatever their order."""
+    known_by_id = {item[id_key]: item for item in known}
+    current_by_id = {item[id_key]: item for item in current}
+    return sorted(
+        item_id for item_id in known_by_id.keys() | current_by_id.keys()
+        if known_by_id.get(item_id) != current_by_id.get(item_id)
+    )
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
     """Update listener."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -65,6 +279,13 @@ async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data: SwitchBotRemoteData = hass.data[DOMAIN].pop(entry.entry_id)
+        await data.quota_store.async_save(data.switchbot.async_client.rate_limiter.as_dict())
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the data saved for a config entry."""
+    for key in ("quota", "devices"):
+        await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.{key}").async_remove()
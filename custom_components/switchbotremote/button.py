@@ -1,10 +1,11 @@
-import humps, logging
+import humps, logging, time
 from typing import List
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Context, HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
 from .const import (
     DOMAIN,
@@ -13,6 +14,8 @@ from .const import (
     IR_LIGHT_TYPES,
     CLASS_BY_TYPE,
     CONF_CUSTOMIZE_COMMANDS,
+    CONF_NON_BLOCKING_BUTTONS,
+    EVENT_COMMAND_RESULT,
     CONF_WITH_ION,
     CONF_WITH_TIMER,
     CONF_WITH_BRIGHTNESS,
@@ -22,10 +25,10 @@ from .const import (
 _LOGGER = logging.getLogger(__name__)
 
 
-class SwitchBotRemoteButton(ButtonEntity):
+class SwitchBotRemoteButton(SwitchBotRemoteEntity, ButtonEntity):
     _attr_has_entity_name = False
 
-    def __init__(self, hass: HomeAssistant, sb: SupportedRemote, command_name: str, command_icon: str) -> None:
+    def __init__(self, hass: HomeAssistant, sb: SupportedRemote, command_name: str, command_icon: str, non_blocking: bool = False) -> None:
         super().__init__()
         self.sb = sb
         self._hass = hass
@@ -33,26 +36,18 @@ class SwitchBotRemoteButton(ButtonEntity):
         self._device_name = sb.name
         self._command_name = command_name
         self._command_icon = command_icon
-
-    def __repr__(self):
-        return f"SwitchBotRemoteButton(command={self._command_name}&device={self.device_info})"
-
-    async def send_command(self, *args):
-        await self._hass.async_add_executor_job(self.sb.command, *args)
-
-    @property
-    def device_info(self):
-        return DeviceInfo(
+        self._non_blocking = non_blocking
+        # Built once, a remote can have dozens of buttons.
+        self._attr_unique_id = self._unique_id + "_" + humps.decamelize(command_name)
+        self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._unique_id)},
             manufacturer="SwitchBot",
             name=self._device_name,
-            model=CLASS_BY_TYPE[self.sb.type] + " Remote",
+            model=CLASS_BY_TYPE[sb.type] + " Remote",
         )
 
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return self._unique_id + "_" + humps.decamelize(self._command_name)
+    def __repr__(self):
+        return f"SwitchBotRemoteButton(command={self._command_name}&device={self.device_info})"
 
     @property
     def name(self) -> str:
@@ -65,54 +60,87 @@ class SwitchBotRemoteButton(ButtonEntity):
         return self._command_icon
 
     async def async_press(self) -> None:
-        """Handle the button press."""
-        await self.send_command(self._command_name, None, True)
+        """Handle the button press.
+
+        In non blocking mode the command is queued and the press returns right
+        away, a `switchbotremote_command_result` event reports the outcome."""
+        if not self._non_blocking:
+            await self.send_command(self._command_name, None, True)
+            return
+
+        self.hass.async_create_background_task(
+            self._async_press_in_background(self._context), f"{DOMAIN} {self.entity_id} press"
+        )
+
+    async def _async_press_in_background(self, context: Context | None) -> None:
+        start = time.monotonic()
+        error = None
+        try:
+            await self.send_command(self._command_name, None, True)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning(f"Pressing {self.name} failed: {err}")
+            error = str(err)
+
+        self.hass.bus.async_fire(
+            EVENT_COMMAND_RESULT,
+            {
+                "entity_id": self.entity_id,
+                "remote_id": self.sb.id,
+                "command": self._command_name,
+                "status": "ok" if error is None else "error",
+                "error": error,
+                "latency_ms": round((time.monotonic() - start) * 1000),
+            },
+            context=context,
+        )
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id]
+    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id].remotes
     entities = []
 
     for remote in remotes:
         options = entry.data.get(remote.id, {})
         customize_commands = options.get(CONF_CUSTOMIZE_COMMANDS, [])
+        non_blocking = options.get(CONF_NON_BLOCKING_BUTTONS, False)
 
         if (remote.type in IR_CAMERA_TYPES):
             entities.append(SwitchBotRemoteButton(
-                hass, remote, "SHUTTER", "mdi:camera-iris"))
+                hass, remote, "SHUTTER", "mdi:camera-iris", non_blocking))
             entities.append(SwitchBotRemoteButton(
-                hass, remote, "MENU", "mdi:menu"))
+                hass, remote, "MENU", "mdi:menu", non_blocking))
             entities.append(SwitchBotRemoteButton(
-                hass, remote, "TIMER", "mdi:timer"))
+                hass, remote, "TIMER", "mdi:timer", non_blocking))
 
         if (remote.type in IR_FAN_TYPES):
             if (options.get(CONF_WITH_ION, False)):
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "ION", "mdi:air-filter"))
+                    hass, remote, "ION", "mdi:air-filter", non_blocking))
             if (options.get(CONF_WITH_TIMER, False)):
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "TIMER", "mdi:timer"))
+                    hass, remote, "TIMER", "mdi:timer", non_blocking))
 
         if (remote.type in IR_LIGHT_TYPES):
             if (options.get(CONF_WITH_BRIGHTNESS, False)):
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "DARKER", "mdi:brightness-4"))
+                    hass, remote, "DARKER", "mdi:brightness-4", non_blocking))
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "BRIGHTER", "mdi:brightness-6"))
+                    hass, remote, "BRIGHTER", "mdi:brightness-6", non_blocking))
 
             if (options.get(CONF_WITH_TEMPERATURE, False)):
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "WARM", "mdi:octagram-minus"))
+                    hass, remote, "WARM", "mdi:octagram-minus", non_blocking))
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, "WHITE", "mdi:octagram-plus"))
+                    hass, remote, "WHITE", "mdi:octagram-plus", non_blocking))
 
-        for command in customize_commands:
+        # A command listed twice would give two buttons the same unique id.
+        for command in dict.fromkeys(customize_commands):
             if (command and command.strip()):
                 entities.append(SwitchBotRemoteButton(
-                    hass, remote, command, "mdi:remote"))
+                    hass, remote, command, "mdi:remote", non_blocking))
 
 
-    _LOGGER.debug(f'Adding buttons {entities}')
+    _LOGGER.debug("Adding buttons %s", entities)
     async_add_entities(entities)
 
     return True
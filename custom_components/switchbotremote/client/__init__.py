@@ -1,8 +1,23 @@
 import uuid
-from typing import List
+from typing import List, Optional
 
-from .client import SwitchBotClient, switchbot_host
+import aiohttp
+
+from .breaker import CircuitBreaker
+from .catalog import DEFAULT_CATALOG_TTL_S, DeviceCatalog
+from .concurrency import DEFAULT_MAX_QUEUE, ConcurrencyLimit
+from .dedup import DEFAULT_DEDUP_WINDOW_S, CommandDedup
+from .codec import RemoteInfo, SceneInfo, decode_remote_list, decode_scene_list
+from .client import AsyncSwitchBotClient, SwitchBotClient, switchbot_host
+from .dispatcher import DEFAULT_COMMAND_GAP_MS, HubDispatcher
+from .hedge import HedgeBudget
+from .metrics import Metrics
+from .ratelimit import Priority, RateLimiter
+from .retry import RetryPolicy
+from .timeouts import AdaptiveTimeout
+from .tracing import Tracer
 from .remote import Remote
+from .scene import Scene
 
 from homeassistant.exceptions import ServiceValidationError
 
@@ -10,18 +25,126 @@ __version__ = "2.3.1"
 
 
 class SwitchBot:
-    def __init__(self, token: str, secret: str, host=switchbot_host):
-        self.client = SwitchBotClient(token, secret, nonce=str(uuid.uuid4()), host=host)
+    def __init__(
+        self,
+        token: str,
+        secret: str,
+        host=switchbot_host,
+        session: Optional[aiohttp.ClientSession] = None,
+        command_gap_ms: int = DEFAULT_COMMAND_GAP_MS,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        catalog_ttl_s: float = DEFAULT_CATALOG_TTL_S,
+        dedup_window_s: float = DEFAULT_DEDUP_WINDOW_S,
+        timeout: Optional[AdaptiveTimeout] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        hedge_budget: Optional[HedgeBudget] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        nonce = str(uuid.uuid4())
+        self.timeout = timeout or AdaptiveTimeout()
+        self.metrics = metrics or Metrics()
+        self.client = SwitchBotClient(token, secret, nonce=nonce, host=host, timeout=self.timeout)
+        self.async_client = (
+            AsyncSwitchBotClient(
+                session,
+                token,
+                secret,
+                nonce=nonce,
+                host=host,
+                rate_limiter=rate_limiter,
+                retry_policy=retry_policy,
+                circuit_breaker=circuit_breaker,
+                timeout=self.timeout,
+                concurrency_limit=concurrency_limit,
+                hedge_budget=hedge_budget,
+                metrics=self.metrics,
+                tracer=tracer,
+            )
+            if session is not None
+            else None
+        )
+        # Commands wait for their hub before they wait for a free slot, both
+        # queues are bounded alike.
+        self.dispatcher = HubDispatcher(
+            command_gap_ms,
+            max_queue=concurrency_limit.max_queue if concurrency_limit is not None else DEFAULT_MAX_QUEUE,
+        )
+        self.dedup = CommandDedup(dedup_window_s)
+        self.catalog = DeviceCatalog(catalog_ttl_s)
+        self.scenes: List[Scene] = []
 
-    def remotes(self) -> List[Remote]:
-        response = self.client.get("devices")
+    def _create_remotes(self, remote_list: List[RemoteInfo]) -> List[Remote]:
         return [
-            Remote.create(client=self.client, id=remote["device_id"], **remote)
-            for remote in response["body"]["infrared_remote_list"]
+            Remote.create(
+                client=self.client,
+                async_client=self.async_client,
+                dispatcher=self.dispatcher,
+                dedup=self.dedup,
+                id=remote.id,
+                device_name=remote.name,
+                remote_type=remote.type,
+                hub_device_id=remote.hub_id,
+            )
+            for remote in remote_list
         ]
 
+    def restore_remotes(self, remote_list: List[dict], fresh: bool = False) -> List[Remote]:
+        """Fill the catalog from a device list fetched elsewhere, see Remote.as_dict.
+        Unless `fresh`, the catalog is left stale so the next read fetches the list from the cloud."""
+        self.catalog.update(self._create_remotes([RemoteInfo.from_dict(remote) for remote in remote_list]))
+        if not fresh:
+            self.catalog.invalidate()
+        return self.catalog.remotes
+
+    def remotes(self, force_refresh: bool = False) -> List[Remote]:
+        if force_refresh or not self.catalog.fresh:
+            response = self.client.get("devices")
+            self.catalog.update(self._create_remotes(decode_remote_list(response["body"])))
+        return self.catalog.remotes
+
     def remote(self, id: str) -> Remote:
-        for remote in self.remotes():
-            if remote.id == id:
-                return remote
-        raise ServiceValidationError(f"Unknown remote {id}")
+        remote = self.catalog.get(id) if self.catalog.fresh else None
+        if remote is None:
+            # The remote may have been added since the list was fetched.
+            self.remotes(force_refresh=True)
+            remote = self.catalog.get(id)
+        if remote is None:
+            raise ServiceValidationError(f"Unknown remote {id}")
+        return remote
+
+    async def _async_fetch_remotes(self, priority: Priority) -> List[Remote]:
+        response = await self.async_client.get("devices", priority=priority)
+        return self._create_remotes(decode_remote_list(response["body"]))
+
+    async def async_remotes(self, priority: Priority = Priority.NORMAL, force_refresh: bool = False) -> List[Remote]:
+        return await self.catalog.async_remotes(
+            lambda: self._async_fetch_remotes(priority), force_refresh=force_refresh
+        )
+
+    async def async_remote(self, id: str) -> Remote:
+        remote = self.catalog.get(id) if self.catalog.fresh else None
+        if remote is None:
+            await self.async_remotes(force_refresh=True)
+            remote = self.catalog.get(id)
+        if remote is None:
+            raise ServiceValidationError(f"Unknown remote {id}")
+        return remote
+
+    def _create_scenes(self, scene_list: List[SceneInfo]) -> List[Scene]:
+        self.scenes = [
+            Scene(id=scene.id, name=scene.name, async_client=self.async_client)
+            for scene in scene_list
+        ]
+        return self.scenes
+
+    def restore_scenes(self, scene_list: List[dict]) -> List[Scene]:
+        """Set `scenes` from a scene list fetched elsewhere, see Scene.as_dict."""
+        return self._create_scenes([SceneInfo.from_dict(scene) for scene in scene_list])
+
+    async def async_fetch_scenes(self, priority: Priority = Priority.NORMAL) -> List[Scene]:
+        """Fetch the manual scenes of the account, kept in `scenes`."""
+        response = await self.async_client.get("scenes", priority=priority)
+        return self._create_scenes(decode_scene_list(response["body"]))
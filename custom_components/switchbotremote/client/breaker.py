@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from enum import StrEnum
+from typing import Callable, List, Optional
+
+import aiohttp
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT_S = 30
+
+FAILURE_EXCEPTIONS = (
+    aiohttp.ClientConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HomeAssistantError):
+    """Exception raised when a call is refused because the SwitchBot cloud is considered down"""
+
+
+class CircuitBreaker:
+    """Stop calling the SwitchBot cloud while it is failing.
+
+    After `failure_threshold` consecutive 5xx errors, timeouts or connection
+    errors the circuit opens and calls fail right away. Once `reset_timeout_s`
+    has passed the circuit is half open: a single probe call goes through and
+    closes the circuit if the server answers, or opens it again otherwise."""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout_s: float = DEFAULT_RESET_TIMEOUT_S):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probing = False
+        self._reset_handle: Optional[asyncio.TimerHandle] = None
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state == CircuitState.OPEN
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` on every state change, returns a function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _set_state(self, state: CircuitState):
+        if state == self._state:
+            return
+        _LOGGER.info(f"SwitchBot API circuit {self._state} -> {state}")
+        self._state = state
+        for listener in list(self._listeners):
+            listener()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out."""
+        if self._state == CircuitState.OPEN:
+            raise CircuitOpenError("SwitchBot API server is unavailable, skipping call")
+        if self._state == CircuitState.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError("SwitchBot API server is being probed, skipping call")
+            self._probing = True
+
+    def is_failure(self, error: BaseException) -> bool:
+        if isinstance(error, FAILURE_EXCEPTIONS):
+            return True
+        http_status = getattr(error, "http_status", None)
+        return http_status is not None and http_status >= 500
+
+    def record(self, error: Optional[BaseException] = None):
+        """Record the outcome of a call let through by `before_call`."""
+        probing, self._probing = self._probing, False
+        if error is not None and self.is_failure(error):
+            self._failures += 1
+            if probing or self._failures >= self.failure_threshold:
+                self._open()
+        elif error is None or getattr(error, "http_status", None) is not None or getattr(error, "status_code", None) is not None:
+            # The server answered, even if it rejected the call.
+            self._failures = 0
+            self._set_state(CircuitState.CLOSED)
+
+    def _open(self):
+        if self._reset_handle is not None:
+            self._reset_handle.cancel()
+        self._reset_handle = asyncio.get_running_loop().call_later(self.reset_timeout_s, self._half_open)
+        self._set_state(CircuitState.OPEN)
+
+    def _half_open(self):
+        self._reset_handle = None
+        self._set_state(CircuitState.HALF_OPEN)
+
+    def cancel(self):
+        """Drop the pending transition to half open."""
+        if self._reset_handle is not None:
+            self._reset_handle.cancel()
+            self._reset_handle = None
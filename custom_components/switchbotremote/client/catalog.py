@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .remote import Remote
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_TTL_S = 300
+
+
+class DeviceCatalog:
+    """Cached list of the remotes of an account, indexed by id, type and hub.
+
+    The list is considered fresh for `ttl_s` seconds after it was fetched or
+    updated. Concurrent async fetches share a single request to the cloud."""
+
+    def __init__(self, ttl_s: float = DEFAULT_CATALOG_TTL_S):
+        self.ttl_s = ttl_s
+
+        self._remotes: List[Remote] = []
+        self._by_id: Dict[str, Remote] = {}
+        self._by_type: Dict[str, List[Remote]] = {}
+        self._by_hub: Dict[str, List[Remote]] = {}
+        self._updated_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def remotes(self) -> List[Remote]:
+        return self._remotes
+
+    @property
+    def fresh(self) -> bool:
+        return self._updated_at is not None and time.monotonic() - self._updated_at < self.ttl_s
+
+    def update(self, remotes: Iterable[Remote]):
+        """Replace the cached remotes and rebuild the indexes."""
+        self._remotes = list(remotes)
+        self._by_id = {}
+        self._by_type = {}
+        self._by_hub = {}
+        for remote in self._remotes:
+            self._by_id[remote.id] = remote
+            self._by_type.setdefault(remote.type, []).append(remote)
+            self._by_hub.setdefault(remote.hub_id, []).append(remote)
+        self._updated_at = time.monotonic()
+
+    def invalidate(self):
+        """Make the next read fetch the list again."""
+        self._updated_at = None
+
+    def get(self, id: str) -> Optional[Remote]:
+        return self._by_id.get(id)
+
+    def by_type(self, *types: str) -> List[Remote]:
+        return [remote for type in types for remote in self._by_type.get(type, ())]
+
+    def by_hub(self, hub_id: str) -> List[Remote]:
+        return list(self._by_hub.get(hub_id, ()))
+
+    async def async_remotes(self, fetch: Callable[[], Awaitable[List[Remote]]], force_refresh: bool = False) -> List[Remote]:
+        """Return the cached remotes, calling `fetch` first if they are stale."""
+        if force_refresh or not self.fresh:
+            await self.async_refresh(fetch)
+        return self._remotes
+
+    async def async_refresh(self, fetch: Callable[[], Awaitable[List[Remote]]]):
+        if self._inflight is None:
+            _LOGGER.debug("Fetching device list")
+            self._inflight = asyncio.ensure_future(self._async_fetch(fetch))
+        else:
+            _LOGGER.debug("Joining device list fetch already in flight")
+
+        await asyncio.shield(self._inflight)
+
+    async def _async_fetch(self, fetch: Callable[[], Awaitable[List[Remote]]]):
+        try:
+            self.update(await fetch())
+        finally:
+            self._inflight = None
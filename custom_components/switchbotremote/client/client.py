@@ -1,16 +1,28 @@
+import asyncio
 import base64
 import hashlib
 import hmac
 import time
 import logging
-from typing import Any
+from typing import Any, Optional, Sequence
 
-import humps
+import aiohttp
 import time
 from requests import request
 
 from homeassistant.exceptions import HomeAssistantError
 
+from .breaker import CircuitBreaker
+from .codec import decode_response
+from .concurrency import ConcurrencyLimit
+from .hedge import HedgeBudget
+from .metrics import CallStats, Metrics
+from .ratelimit import Priority, RateLimiter
+from .requestlog import RequestLog, RequestRecord
+from .retry import RetryPolicy, parse_retry_after
+from .timeouts import DEADLINE_TIMER_SLACK_S, AdaptiveTimeout, DeadlineExceededError, current_deadline
+from .tracing import Tracer, add_span, span
+
 _LOGGER = logging.getLogger(__name__)
 switchbot_host = "https://api.switch-bot.com"
 api_version = "v1.1"
@@ -18,12 +30,18 @@ api_version = "v1.1"
 MAX_TRIES = 5
 DELAY_BETWEEN_TRIES_MS = 500
 
-class SwitchBotClient:
-    def __init__(self, token: str, secret: str, nonce: str, host=switchbot_host):
+# Default deadline of the async requests: the one of the caller context.
+_CURRENT_DEADLINE: Any = object()
+
+class BaseSwitchBotClient:
+    """Signing and response handling shared by the sync and async clients."""
+
+    def __init__(self, token: str, secret: str, nonce: str, host=switchbot_host, timeout: Optional[AdaptiveTimeout] = None):
         self._host = host
         self._token = token
         self._secret = secret
         self._nonce = nonce
+        self.timeout = timeout or AdaptiveTimeout()
 
     @property
     def headers(self):
@@ -41,31 +59,43 @@ class SwitchBotClient:
 
         headers["Authorization"] = self._token
         headers["t"] = str(timestamp)
-        headers["sign"] = signature
+        headers["sign"] = signature.decode()
         headers["nonce"] = self._nonce
 
         return headers
 
-    def __request(self, method: str, path: str, **kwargs) -> Any:
-        url = f"{self._host}/{api_version}/{path}"
-        _LOGGER.debug(f"Calling service {url}")
-        response = request(method, url, headers=self.headers, **kwargs)
+    def _url(self, path: str) -> str:
+        return f"{self._host}/{api_version}/{path}"
 
-        if response.status_code != 200:
-            _LOGGER.debug(f"Received http error {response.status_code} {response.text}")
-            if response.status_code != 500:
-                raise HomeAssistantError(f"SwitchBot API server returns status {response.status_code}")
+    def _handle_response(self, url: str, status: int, text: str, headers=None) -> Any:
+        if status != 200:
+            _LOGGER.debug(f"Received http error {status} {text}")
+            retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+            if status != 500:
+                raise SwitchBotApiError(f"SwitchBot API server returns status {status}", http_status=status, retry_after=retry_after)
             else:
-                raise SwitchbotInternal500Error
+                raise SwitchbotInternal500Error(http_status=status, retry_after=retry_after)
 
-        response_in_json = humps.decamelize(response.json())
+        response_in_json = decode_response(text)
         if response_in_json["status_code"] != 100:
             _LOGGER.debug(f"Received error in response {response_in_json}")
-            raise HomeAssistantError(f'An error occurred: {response_in_json["message"]}')
+            raise SwitchBotApiError(f'An error occurred: {response_in_json["message"]}', http_status=status, status_code=response_in_json["status_code"])
 
         _LOGGER.debug(f"Call service {url} OK")
         return response_in_json
 
+
+class SwitchBotClient(BaseSwitchBotClient):
+    def __request(self, method: str, path: str, **kwargs) -> Any:
+        url = self._url(path)
+        _LOGGER.debug(f"Calling service {url}")
+        kwargs.setdefault("timeout", (self.timeout.connect_s, self.timeout.read_s))
+        start = time.monotonic()
+        response = request(method, url, headers=self.headers, **kwargs)
+        self.timeout.record(time.monotonic() - start)
+
+        return self._handle_response(url, response.status_code, response.text, response.headers)
+
     def request(self, method: str, path: str, maxNumberOfTrials: int = MAX_TRIES, delayMSBetweenTrials: int = DELAY_BETWEEN_TRIES_MS, **kwargs) -> Any:
         """Try to send the request.
         If the server returns a 500 Internal error status, will retry until it succeeds or it passes a threshold of max number of tries.
@@ -94,5 +124,242 @@ class SwitchBotClient:
     def delete(self, path: str, **kwargs) -> Any:
         return self.request("DELETE", path, **kwargs)
 
-class SwitchbotInternal500Error(HomeAssistantError):
+
+class AsyncSwitchBotClient(BaseSwitchBotClient):
+    """SwitchBot client running on the event loop.
+
+    Requests go through the given aiohttp session, so connections to the
+    SwitchBot cloud are kept alive and reused between commands. When a rate
+    limiter is given, every call to the cloud, retries included, takes a
+    token from it right before it is sent, so calls refused earlier do not
+    count against the quota. Failed calls are retried as `retry_policy`
+    says, waiting on the event loop between attempts, unless the circuit
+    breaker has opened in the meantime.
+
+    Requests in flight are capped by `concurrency_limit`, so a slow cloud
+    makes calls wait or fail fast instead of piling up.
+
+    Every attempt has connect and read timeouts, see AdaptiveTimeout, and no
+    call runs past its retry budget or the deadline it is given, by default
+    the one set with `timeouts.deadline` around it.
+
+    GET requests, and only those, may be hedged as `hedge_budget` allows: a
+    read slower than usual is sent again and the first answer is used.
+
+    The last calls are kept in `request_log` with their outcome and timings.
+    When `tracer` is enabled each stage of a traced call is timed as a span:
+    rate limiting, waiting for a free slot, signing, HTTP attempts and the
+    backoff sleeps between them."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        token: str,
+        secret: str,
+        nonce: str,
+        host=switchbot_host,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: Optional[AdaptiveTimeout] = None,
+        concurrency_limit: Optional[ConcurrencyLimit] = None,
+        hedge_budget: Optional[HedgeBudget] = None,
+        metrics: Optional[Metrics] = None,
+        request_log: Optional[RequestLog] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        super().__init__(token, secret, nonce, host=host, timeout=timeout)
+        self._session = session
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.concurrency_limit = concurrency_limit or ConcurrencyLimit()
+        self.hedge_budget = hedge_budget or HedgeBudget()
+        self.metrics = metrics or Metrics()
+        self.request_log = request_log or RequestLog()
+        self.tracer = tracer or Tracer()
+
+    async def __request(
+        self,
+        method: str,
+        path: str,
+        priority: Priority = Priority.NORMAL,
+        deadline: Optional[float] = None,
+        record: Optional[RequestRecord] = None,
+        seq: int = 0,
+        **kwargs,
+    ) -> Any:
+        url = self._url(path)
+        loop = asyncio.get_running_loop()
+        queued = loop.time()
+        self.circuit_breaker.before_call()
+        try:
+            waiting = time.monotonic()
+            async with self.concurrency_limit:
+                add_span("concurrency_wait", waiting)
+                if deadline is not None and deadline <= loop.time():
+                    raise DeadlineExceededError(f"No time left to call {url}")
+
+                # Only calls about to reach the cloud count against the quota.
+                if self.rate_limiter is not None:
+                    with span("rate_limit", priority=priority.name):
+                        await self.rate_limiter.acquire(priority)
+
+                remaining = None
+                if deadline is not None and (remaining := deadline - loop.time()) <= 0:
+                    raise DeadlineExceededError(f"No time left to call {url}")
+
+                _LOGGER.debug(f"Calling service {url}")
+                kwargs.setdefault("timeout", aiohttp.ClientTimeout(
+                    total=remaining, connect=self.timeout.connect_s, sock_read=self.timeout.read_s
+                ))
+                with span("sign"):
+                    headers = self.headers
+                start = loop.time()
+                if record is not None and record.seq == seq:
+                    record.queue_wait_s += start - queued
+                with span("http", method=method, path=path) as http_span:
+                    try:
+                        async with self._session.request(method, url, headers=headers, **kwargs) as response:
+                            text = await response.text()
+                    except asyncio.TimeoutError as err:
+                        # The caller ran out of time, the server is not to blame.
+                        if deadline is not None and loop.time() >= deadline - DEADLINE_TIMER_SLACK_S:
+                            raise DeadlineExceededError(f"Call to {url} ran past its deadline") from err
+                        raise
+                    if http_span is not None:
+                        http_span.attrs["http_status"] = response.status
+                latency = loop.time() - start
+                self.timeout.record(latency)
+                if method == "GET":
+                    self.hedge_budget.record(latency)
+
+            result = self._handle_response(url, response.status, text, response.headers)
+        except BaseException as err:
+            self.circuit_breaker.record(err)
+            raise
+
+        self.circuit_breaker.record()
+        return result
+
+    async def __hedged_request(self, method: str, path: str, priority: Priority, deadline: Optional[float], record: RequestRecord, seq: int, **kwargs) -> Any:
+        self.hedge_budget.earn()
+        first = asyncio.ensure_future(self.__request(method, path, priority, deadline, record, seq, **kwargs))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_budget.delay())
+            if done or not self.hedge_budget.try_spend():
+                return await first
+
+            _LOGGER.debug(f"No answer yet to {method} {path}, hedging it")
+            pending.add(asyncio.ensure_future(self.__request(method, path, Priority.LOW, deadline, **kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        return task.result()
+            # Both failed, report the error of the original request.
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        priority: Priority = Priority.NORMAL,
+        retry_policy: Optional[RetryPolicy] = None,
+        deadline: Optional[float] = _CURRENT_DEADLINE,
+        stats: Sequence[CallStats] = (),
+        remote_id: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """Try to send the request.
+        Errors the retry policy deems transient are retried until the call succeeds, the
+        policy runs out of attempts or the next wait would go past its time budget or
+        `deadline`, an event loop time, by default the one of the caller context and
+        none if None. No attempt runs past either of them. Any other error will be thrown.
+        The outcome is recorded in the account metrics and in `stats`, and logged in the
+        request log along with `remote_id`."""
+        policy = retry_policy or self.retry_policy
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        record = self.request_log.start(method, path, remote_id)
+        seq = record.seq
+        if deadline is _CURRENT_DEADLINE:
+            deadline = current_deadline()
+        # The retry budget bounds the attempts too, not only the waits between them.
+        retry_end = loop.time() + policy.budget_s
+        if deadline is not None:
+            retry_end = min(retry_end, deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with span("attempt", number=attempt):
+                    if method == "GET" and self.hedge_budget.enabled:
+                        result = await self.__hedged_request(method, path, priority, retry_end, record, seq, **kwargs)
+                    else:
+                        result = await self.__request(method, path, priority, retry_end, record, seq, **kwargs)
+            except Exception as err:  # pylint: disable=broad-except
+                delay = policy.delay(attempt, getattr(err, "retry_after", None))
+                if (
+                    not policy.is_retryable(err)
+                    or attempt >= policy.max_attempts
+                    or loop.time() + delay > retry_end
+                ):
+                    latency = loop.time() - start
+                    self.metrics.record(latency, attempt, err, stats)
+                    self.request_log.finish(
+                        record, seq, latency, attempt,
+                        getattr(err, "http_status", None), getattr(err, "status_code", None), err,
+                    )
+                    final_error = self._final_error(err, attempt)
+                    if final_error is err:
+                        raise
+                    raise final_error from err
+
+                _LOGGER.warning(f"Call to SwitchBot API server failed ({err!r}), retrying")
+                _LOGGER.debug(f"attempt = {attempt}, waiting {delay * 1000:.0f} ms")
+                with span("backoff", attempt=attempt):
+                    await asyncio.sleep(delay)
+            else:
+                latency = loop.time() - start
+                self.metrics.record(latency, attempt, stats=stats)
+                self.request_log.finish(record, seq, latency, attempt, 200, result.get("status_code"))
+                return result
+
+    @staticmethod
+    def _final_error(err: Exception, attempts: int) -> Exception:
+        if isinstance(err, SwitchbotInternal500Error) and attempts > 1:
+            return SwitchbotInternal500Error(f"Received multiple ({attempts}) consecutive 500 errors from SwitchBot API server", http_status=500)
+        if isinstance(err, HomeAssistantError):
+            return err
+        return HomeAssistantError(f"Error communicating with SwitchBot API server: {err!r}")
+
+    async def get(self, path: str, **kwargs) -> Any:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> Any:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> Any:
+        return await self.request("PUT", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> Any:
+        return await self.request("DELETE", path, **kwargs)
+
+
+class SwitchBotApiError(HomeAssistantError):
+    """Exception raised if the Switchbot cloud API rejected a call"""
+
+    def __init__(self, *args, http_status: Optional[int] = None, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(*args)
+        self.http_status = http_status
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class SwitchbotInternal500Error(SwitchBotApiError):
     """Exception raised if the 500 status error has been received from Switchbot cloud API"""
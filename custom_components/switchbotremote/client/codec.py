@@ -0,0 +1,85 @@
+"""Encoding and decoding of the SwitchBot API payloads.
+
+Only the keys the integration reads are mapped, instead of converting the
+case of every key of every response and request."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
+
+@dataclass(frozen=True, slots=True)
+class RemoteInfo:
+    id: str
+    name: Optional[str]
+    type: Optional[str]
+    hub_id: Optional[str]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the fields under the snake case names of the device list."""
+        return {
+            "device_id": self.id,
+            "device_name": self.name,
+            "remote_type": self.type,
+            "hub_device_id": self.hub_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> RemoteInfo:
+        return cls(data["device_id"], data.get("device_name"), data.get("remote_type"), data.get("hub_device_id"))
+
+
+@dataclass(frozen=True, slots=True)
+class SceneInfo:
+    id: str
+    name: Optional[str]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the fields under the snake case names of the scene list."""
+        return {"scene_id": self.id, "scene_name": self.name}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> SceneInfo:
+        return cls(data["scene_id"], data.get("scene_name"))
+
+
+def decode_response(text: str) -> Dict[str, Any]:
+    """Decode the response envelope, the body is returned as sent by the server."""
+    data = json_loads(text)
+    return {
+        "status_code": data.get("statusCode"),
+        "message": data.get("message"),
+        "body": data.get("body"),
+    }
+
+
+def decode_remote_list(body: Dict[str, Any]) -> List[RemoteInfo]:
+    """Decode the infrared remotes of a `GET devices` body."""
+    return [
+        RemoteInfo(remote["deviceId"], remote.get("deviceName"), remote.get("remoteType"), remote.get("hubDeviceId"))
+        for remote in body.get("infraredRemoteList") or ()
+    ]
+
+
+def decode_scene_list(body: List[Dict[str, Any]]) -> List[SceneInfo]:
+    """Decode the body of a `GET scenes` call."""
+    return [SceneInfo(scene["sceneId"], scene.get("sceneName")) for scene in body or ()]
+
+
+_COMMAND_TEMPLATES = {
+    False: {"commandType": "command"},
+    True: {"commandType": "customize"},
+}
+
+
+def encode_command(action: str, parameter: Optional[str] = None, customize: Optional[bool] = False) -> Dict[str, str]:
+    """Build the body of a `POST devices/{id}/commands` call."""
+    payload = _COMMAND_TEMPLATES[bool(customize)].copy()
+    payload["command"] = action
+    payload["parameter"] = "default" if parameter is None else parameter
+    return payload
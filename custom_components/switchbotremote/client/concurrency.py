@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .timeouts import LatencyWindow
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_QUEUE = 50
+
+
+class ConcurrencyLimitError(HomeAssistantError):
+    """Exception raised when too many calls are already waiting for the SwitchBot cloud"""
+
+
+class ConcurrencyLimit:
+    """Cap the calls to the SwitchBot cloud in flight at once.
+
+    At most `size` calls run at the same time, the others wait in turn. Once
+    `max_queue` calls are waiting, new calls fail right away instead of
+    piling up while the cloud is slow."""
+
+    def __init__(self, size: int = DEFAULT_MAX_CONCURRENCY, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.size = size
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.waits = LatencyWindow()
+
+        self._semaphore = asyncio.Semaphore(size)
+        self._in_flight = 0
+        self._waiting = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def __aenter__(self):
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ConcurrencyLimitError(f"{self._waiting} calls to the SwitchBot API server are already waiting")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self.waits.record(loop.time() - start)
+        self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def as_dict(self) -> Dict[str, Any]:
+        p50 = self.waits.percentile(50)
+        p95 = self.waits.percentile(95)
+        return {
+            "size": self.size,
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "max_queue": self.max_queue,
+            "wait_p50_ms": None if p50 is None else round(p50 * 1000),
+            "wait_p95_ms": None if p95 is None else round(p95 * 1000),
+            "rejected": self.rejected,
+        }
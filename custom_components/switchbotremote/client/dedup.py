@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DEDUP_WINDOW_S = 60
+
+
+class CommandDedup:
+    """Drop absolute commands repeating the last command sent to a remote.
+
+    Only the last command of each remote is kept, keyed by (remote, command,
+    parameter): any other command in between, such as a toggle, makes the next
+    absolute command go out again. Entries expire after `window_s` seconds, 0
+    disables the deduplication."""
+
+    def __init__(self, window_s: float = DEFAULT_DEDUP_WINDOW_S):
+        self.window_s = window_s
+        self.dropped = 0
+
+        self._last: Dict[str, Tuple[str, str, float]] = {}
+
+    def check(self, remote_id: str, action: str, parameter: Optional[str], skippable: bool) -> bool:
+        """Return False if the command repeats the last one and can be dropped, else record it as sent."""
+        parameter = "default" if parameter is None else parameter
+        now = time.monotonic()
+
+        last = self._last.get(remote_id)
+        if (
+            skippable
+            and last is not None
+            and last[:2] == (action, parameter)
+            and now - last[2] < self.window_s
+        ):
+            self.dropped += 1
+            _LOGGER.debug(f"Dropping {action} {parameter} already sent to {remote_id}")
+            return False
+
+        if skippable and self.window_s > 0:
+            self._last[remote_id] = (action, parameter, now)
+        else:
+            self._last.pop(remote_id, None)
+        return True
+
+    def forget(self, remote_id: str):
+        """Let the next command of a remote go out, e.g. after it failed or the device changed state on its own."""
+        self._last.pop(remote_id, None)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .concurrency import DEFAULT_MAX_QUEUE, ConcurrencyLimitError
+from .timeouts import LatencyWindow
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_COMMAND_GAP_MS = 250
+
+
+class _Job:
+    __slots__ = ("send", "futures", "queued")
+
+    def __init__(self, send: Callable[[], Awaitable[Any]], futures: List[asyncio.Future], queued: float):
+        self.send = send
+        self.futures = futures
+        self.queued = queued
+
+
+class HubDispatcher:
+    """Send IR commands through one ordered queue per SwitchBot hub.
+
+    A hub can only blast one code at a time, so commands for the same hub are
+    sent one after the other with at least `gap_ms` between them, while
+    different hubs are served in parallel. A command submitted with a `key`
+    replaces a still waiting command with the same key, and every caller of
+    the replaced command gets the result of the newer one.
+
+    Once `max_queue` commands wait for a hub, new ones for it fail right
+    away with ConcurrencyLimitError, as calls do in ConcurrencyLimit."""
+
+    def __init__(self, gap_ms: int = DEFAULT_COMMAND_GAP_MS, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.gap_ms = gap_ms
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.waits = LatencyWindow()
+        self._pending: Dict[str, OrderedDict] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._last_sent: Dict[str, float] = {}
+
+    def queue_depth(self, hub_id: Optional[str] = None) -> int:
+        if hub_id is not None:
+            return len(self._pending.get(hub_id, ()))
+        return sum(len(pending) for pending in self._pending.values())
+
+    async def submit(self, hub_id: Optional[str], send: Callable[[], Awaitable[Any]], key: Optional[Hashable] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        hub_id = hub_id or ""
+        future = loop.create_future()
+        pending = self._pending.setdefault(hub_id, OrderedDict())
+
+        futures = [future]
+        if (key is None or key not in pending) and len(pending) >= self.max_queue:
+            self.rejected += 1
+            raise ConcurrencyLimitError(f"{len(pending)} commands are already waiting for SwitchBot hub {hub_id}")
+
+        if key is not None and key in pending:
+            # Drop the waiting command and queue the newer one at the end, so
+            # it keeps its place relative to commands submitted in between.
+            _LOGGER.debug(f"Superseding queued command {key} on hub {hub_id}")
+            futures = pending.pop(key).futures + futures
+
+        pending[key if key is not None else object()] = _Job(send, futures, loop.time())
+
+        if hub_id not in self._workers:
+            # The worker serves every later caller, it must not inherit the
+            # deadline and trace of this one.
+            self._workers[hub_id] = loop.create_task(self._run(hub_id), context=contextvars.Context())
+
+        return await future
+
+    async def _run(self, hub_id: str):
+        loop = asyncio.get_running_loop()
+        pending = self._pending[hub_id]
+        job = None
+        try:
+            while pending:
+                delay = self._last_sent.get(hub_id, 0) + self.gap_ms / 1000 - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                _, job = pending.popitem(last=False)
+                if all(future.done() for future in job.futures):
+                    continue
+
+                self.waits.record(loop.time() - job.queued)
+                try:
+                    result = await job.send()
+                except Exception as err:  # pylint: disable=broad-except
+                    for future in job.futures:
+                        if not future.done():
+                            future.set_exception(err)
+                else:
+                    for future in job.futures:
+                        if not future.done():
+                            future.set_result(result)
+                finally:
+                    self._last_sent[hub_id] = loop.time()
+                job = None
+        finally:
+            # Only reached with work left over when the worker is cancelled.
+            self._workers.pop(hub_id, None)
+            interrupted = ([job] if job is not None else []) + list(pending.values())
+            pending.clear()
+            for interrupted_job in interrupted:
+                for future in interrupted_job.futures:
+                    future.cancel()
+
+    def as_dict(self) -> Dict[str, Any]:
+        p50 = self.waits.percentile(50)
+        p95 = self.waits.percentile(95)
+        return {
+            "queue_depth": self.queue_depth(),
+            "hubs": {hub_id: len(pending) for hub_id, pending in self._pending.items() if pending},
+            "max_queue": self.max_queue,
+            "wait_p50_ms": None if p50 is None else round(p50 * 1000),
+            "wait_p95_ms": None if p95 is None else round(p95 * 1000),
+            "rejected": self.rejected,
+        }
+
+    def cancel(self):
+        """Stop every hub worker and cancel the commands still waiting."""
+        for worker in list(self._workers.values()):
+            worker.cancel()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from .timeouts import DEFAULT_LATENCY_WINDOW, MIN_LATENCY_SAMPLES, LatencyWindow
+
+DEFAULT_HEDGE_BUDGET_PERCENT = 0
+DEFAULT_HEDGE_PERCENTILE = 90
+# Used until enough latencies are known to compute the percentile.
+DEFAULT_HEDGE_DELAY_S = 1.0
+DEFAULT_HEDGE_BURST = 2
+
+
+class HedgeBudget:
+    """When and how often a slow read may be sent a second time.
+
+    A read that has not answered after the `percentile` latency gets a second,
+    identical request, whichever answers first wins. Each read earns
+    `budget_percent` hundredths of a hedge, up to `burst` saved, so hedges
+    stay a small share of the calls and of the daily quota. The percentile
+    is taken over the last `window` reads only, commands take longer."""
+
+    def __init__(
+        self,
+        budget_percent: float = DEFAULT_HEDGE_BUDGET_PERCENT,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        burst: float = DEFAULT_HEDGE_BURST,
+        window: int = DEFAULT_LATENCY_WINDOW,
+    ):
+        self.budget_percent = budget_percent
+        self.percentile = percentile
+        self.burst = burst
+        self.hedged = 0
+        self.latencies = LatencyWindow(window)
+
+        self._tokens = float(burst) if budget_percent > 0 else 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_percent > 0
+
+    def delay(self) -> float:
+        """Return how long to wait for the first request before hedging it."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_S
+        return self.latencies.percentile(self.percentile)
+
+    def record(self, latency_s: float):
+        """Record the latency of a read the server answered."""
+        self.latencies.record(latency_s)
+
+    def earn(self):
+        """Account for a read, which adds to the budget."""
+        self._tokens = min(self.burst, self._tokens + self.budget_percent / 100)
+
+    def try_spend(self) -> bool:
+        """Take a hedge from the budget, return False if there is none left."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from .remote import Remote
+from .scene import Scene
+
+# Scenes run on the cloud side and are not bound to a hub, they share one lane.
+SCENE_LANE = ("scene",)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class MacroStep:
+    """A command of a macro, sent `delay_s` after the previous step on the same hub.
+
+    For a scene step `remote_id` is the scene id and the command is ignored."""
+
+    remote_id: str
+    command: str
+    parameter: Optional[str] = None
+    customize: bool = False
+    delay_s: float = 0
+
+
+async def async_run_macro(steps: Sequence[Tuple[Union[Remote, Scene], MacroStep]]) -> List[Dict[str, Any]]:
+    """Run the steps of a macro and return the timing of each of them, in step order.
+
+    Steps on different hubs run in parallel, steps on the same hub keep their
+    order. A failed step is reported in its result and does not stop the others."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(steps)
+
+    by_hub: Dict[Hashable, List[int]] = {}
+    for index, (target, _) in enumerate(steps):
+        by_hub.setdefault(SCENE_LANE if isinstance(target, Scene) else target.hub_id, []).append(index)
+
+    async def run_hub(indexes: List[int]):
+        for index in indexes:
+            target, step = steps[index]
+            if step.delay_s:
+                await asyncio.sleep(step.delay_s)
+
+            is_scene = isinstance(target, Scene)
+            sent_at = loop.time()
+            error = None
+            try:
+                if is_scene:
+                    await target.async_execute()
+                else:
+                    await target.async_command(step.command, step.parameter, step.customize)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning(f"Macro step {index} {step.command} on {target} failed: {err}")
+                error = str(err)
+            done_at = loop.time()
+
+            results[index] = {
+                "scene" if is_scene else "remote": target.id,
+                "hub": None if is_scene else target.hub_id,
+                "command": step.command,
+                "started_ms": round((sent_at - start) * 1000),
+                "latency_ms": round((done_at - sent_at) * 1000),
+                "error": error,
+            }
+
+    await asyncio.gather(*(run_hub(indexes) for indexes in by_hub.values()))
+    _LOGGER.debug(f"Macro of {len(steps)} steps on {len(by_hub)} hubs ran in {loop.time() - start:.3f}s")
+
+    return results
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+from .timeouts import LatencyWindow
+
+DEFAULT_METRICS_WINDOW = 200
+
+
+class CallStats:
+    """Counters and recent latencies of a set of calls to the SwitchBot cloud.
+
+    Recording is a few counter increments and a bounded append, the
+    percentiles are only computed when read."""
+
+    __slots__ = ("calls", "errors", "retries", "latencies")
+
+    def __init__(self, window: int = DEFAULT_METRICS_WINDOW):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.latencies = LatencyWindow(window)
+
+    def record(self, latency_s: float, attempts: int = 1, error: Optional[BaseException] = None):
+        self.calls += 1
+        self.retries += attempts - 1
+        if error is None:
+            self.latencies.record(latency_s)
+        else:
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def percentile_ms(self, q: float) -> Optional[int]:
+        value = self.latencies.percentile(q)
+        return None if value is None else round(value * 1000)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "retries": self.retries,
+            "latency_p50_ms": self.percentile_ms(50),
+            "latency_p95_ms": self.percentile_ms(95),
+            "latency_p99_ms": self.percentile_ms(99),
+        }
+
+
+class Metrics:
+    """Call statistics of an account, in total and by remote and hub."""
+
+    def __init__(self, window: int = DEFAULT_METRICS_WINDOW):
+        self.window = window
+        self.account = CallStats(window)
+        self.remotes: Dict[str, CallStats] = {}
+        self.hubs: Dict[str, CallStats] = {}
+
+    def remote(self, remote_id: str) -> CallStats:
+        if (stats := self.remotes.get(remote_id)) is None:
+            stats = self.remotes[remote_id] = CallStats(self.window)
+        return stats
+
+    def hub(self, hub_id: Optional[str]) -> CallStats:
+        hub_id = hub_id or ""
+        if (stats := self.hubs.get(hub_id)) is None:
+            stats = self.hubs[hub_id] = CallStats(self.window)
+        return stats
+
+    def record(self, latency_s: float, attempts: int = 1, error: Optional[BaseException] = None, stats: Sequence[CallStats] = ()):
+        """Record a call in the account totals and in the given `stats`."""
+        self.account.record(latency_s, attempts, error)
+        for extra in stats:
+            extra.record(latency_s, attempts, error)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import Any, Callable, List, Optional
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# The SwitchBot cloud allows 10,000 calls per token and per day.
+DEFAULT_DAILY_QUOTA = 10000
+DEFAULT_QUOTA_RESERVE_PERCENT = 10
+DEFAULT_BURST = 20
+DEFAULT_REFILL_PER_SECOND = 5.0
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+
+
+class QuotaExceededError(HomeAssistantError):
+    """Exception raised when a call would go over the daily SwitchBot API quota"""
+
+
+class RateLimiter:
+    """Token bucket for bursts plus a daily call budget.
+
+    Calls wait for a token when the bucket is empty. Once the daily budget
+    drops below the reserve, low priority calls are rejected so that the
+    remaining calls are kept for user commands. The daily counters can be
+    saved with `as_dict` and loaded back with `restore`."""
+
+    def __init__(
+        self,
+        daily_quota: int = DEFAULT_DAILY_QUOTA,
+        reserve_percent: int = DEFAULT_QUOTA_RESERVE_PERCENT,
+        burst: int = DEFAULT_BURST,
+        refill_per_second: float = DEFAULT_REFILL_PER_SECOND,
+    ):
+        self.daily_quota = daily_quota
+        self.reserve = int(daily_quota * reserve_percent / 100)
+        self.burst = burst
+        self.refill_per_second = refill_per_second
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._day = self._today()
+        self._used = 0
+        self._listeners: List[Callable[[], None]] = []
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _roll_day(self):
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    @property
+    def used(self) -> int:
+        self._roll_day()
+        return self._used
+
+    @property
+    def remaining(self) -> int:
+        return max(self.daily_quota - self.used, 0)
+
+    @property
+    def projected_exhaustion(self) -> Optional[datetime]:
+        """When the quota runs out at today's average rate, if before the daily reset."""
+        used = self.used
+        if used == 0:
+            return None
+
+        now = datetime.now(timezone.utc)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = max((now - day_start).total_seconds(), 1)
+        exhaustion = now + timedelta(seconds=self.remaining * elapsed / used)
+        if exhaustion >= day_start + timedelta(days=1):
+            return None
+        return exhaustion
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` whenever the counters change, returns a function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def acquire(self, priority: Priority = Priority.NORMAL):
+        self._roll_day()
+        if self._used >= self.daily_quota:
+            raise QuotaExceededError(f"Daily SwitchBot API quota of {self.daily_quota} calls exhausted")
+        if priority < Priority.NORMAL and self.daily_quota - self._used <= self.reserve:
+            raise QuotaExceededError("SwitchBot API quota is low, low priority call rejected")
+
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.refill_per_second)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                break
+            wait = (1 - self._tokens) / self.refill_per_second
+            _LOGGER.debug(f"Rate limit reached, waiting {wait:.2f} s")
+            await asyncio.sleep(wait)
+
+        self._tokens -= 1
+        self._used += 1
+        for listener in list(self._listeners):
+            listener()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"day": self._day, "used": self._used}
+
+    def restore(self, data: Optional[dict[str, Any]]):
+        if data and data.get("day") == self._today():
+            self._day = data["day"]
+            self._used = int(data.get("used", 0))
@@ -1,36 +1,70 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-import humps
-from typing import ClassVar, Dict, Optional, Type
-from .client import SwitchBotClient
+import time
+from typing import ClassVar, Dict, Iterable, Optional, Tuple, Type
+from .client import AsyncSwitchBotClient, SwitchBotClient
+from .codec import encode_command
+from .dedup import CommandDedup
+from .dispatcher import HubDispatcher
+from .retry import NO_RETRY
+from .timeouts import current_deadline
+from .tracing import activate, add_span, current_trace, span
 
 _LOGGER = logging.getLogger(__name__)
 
+# Commands that set an absolute state: a newer one makes a queued one useless.
+ABSOLUTE_COMMANDS = frozenset({"setAll", "turnOn", "turnOff"})
+
+DEFAULT_KEY_GAP_MS = 300
+
 class Remote:
     remote_type_for: ClassVar[Optional[str]] = None
     specialized_cls: ClassVar[Dict[str, Type[Remote]]] = {}
 
-    def __init__(self, client: SwitchBotClient, id: str, **extra):
+    def __init__(self, client: SwitchBotClient, id: str, async_client: Optional[AsyncSwitchBotClient] = None, dispatcher: Optional[HubDispatcher] = None, dedup: Optional[CommandDedup] = None, **extra):
         self.client = client
+        self.async_client = async_client
+        self.dispatcher = dispatcher
+        self.dedup = dedup
 
         self.id: str = id
         self.name: str = extra.get("device_name")
         self.type: str = extra.get("remote_type")
         self.hub_id: str = extra.get("hub_device_id")
 
+    @property
+    def available(self) -> bool:
+        """Whether commands can currently reach the SwitchBot cloud."""
+        return self.async_client is None or not self.async_client.circuit_breaker.is_open
+
     def __init_subclass__(cls):
         if cls.remote_type_for is not None:
             cls.specialized_cls[cls.remote_type_for] = cls
 
     @classmethod
-    def create(cls, client: SwitchBotClient, id: str, **extra):
+    def create(cls, client: SwitchBotClient, id: str, async_client: Optional[AsyncSwitchBotClient] = None, dispatcher: Optional[HubDispatcher] = None, dedup: Optional[CommandDedup] = None, **extra):
         remote_type = extra.get("remote_type")
         if remote_type == "Others":
-            return OtherRemote(client, id=id, **extra)
+            return OtherRemote(client, id=id, async_client=async_client, dispatcher=dispatcher, dedup=dedup, **extra)
         else:
             remote_cls = cls.specialized_cls.get(remote_type, SupportedRemote)
-            return remote_cls(client, id=id, **extra)
+            return remote_cls(client, id=id, async_client=async_client, dispatcher=dispatcher, dedup=dedup, **extra)
+
+    def _should_send(self, action: str, parameter: Optional[str], customize: Optional[bool]) -> bool:
+        if self.dedup is None:
+            return True
+        return self.dedup.check(self.id, action, parameter, skippable=not customize and action in ABSOLUTE_COMMANDS)
+
+    def _stats(self):
+        metrics = self.async_client.metrics
+        return (metrics.remote(self.id), metrics.hub(self.hub_id))
+
+    def forget_sent_commands(self):
+        """Send the next command even if it repeats the last one, the device state changed on its own."""
+        if self.dedup is not None:
+            self.dedup.forget(self.id)
 
     def command(
         self,
@@ -38,19 +72,111 @@ class Remote:
         parameter: Optional[str] = None,
         customize: Optional[bool] = False
     ):
+        if not self._should_send(action, parameter, customize):
+            return
+
         _LOGGER.debug(f"Sending command {action}")
-        parameter = "default" if parameter is None else parameter
-        command_type = "customize" if customize else "command"
-        payload = humps.camelize(
-            {
-                "command_type": command_type,
-                "command": action,
-                "parameter": parameter,
-            }
-        )
+        payload = encode_command(action, parameter, customize)
 
         _LOGGER.debug(f"Command payload {payload}")
-        self.client.post(f"devices/{self.id}/commands", json=payload)
+        try:
+            self.client.post(f"devices/{self.id}/commands", json=payload)
+        except Exception:
+            self.forget_sent_commands()
+            raise
+
+    async def async_command(
+        self,
+        action: str,
+        parameter: Optional[str] = None,
+        customize: Optional[bool] = False
+    ):
+        if self.async_client is None:
+            raise RuntimeError(f"{self!r} was created without an async client")
+
+        if not self._should_send(action, parameter, customize):
+            return
+
+        _LOGGER.debug(f"Sending command {action}")
+        with span("encode", command=action):
+            payload = encode_command(action, parameter, customize)
+
+        _LOGGER.debug(f"Command payload {payload}")
+
+        # The hub worker runs outside of the caller context, the deadline and trace go along.
+        deadline = current_deadline()
+        trace = current_trace()
+        queued = time.monotonic()
+
+        async def send():
+            with activate(trace):
+                add_span("hub_queue", queued, hub_id=self.hub_id)
+                return await self.async_client.post(f"devices/{self.id}/commands", json=payload, deadline=deadline, stats=self._stats(), remote_id=self.id)
+
+        try:
+            if self.dispatcher is None:
+                await send()
+                return
+
+            key = (self.id, action) if not customize and action in ABSOLUTE_COMMANDS else None
+            await self.dispatcher.submit(self.hub_id, send, key=key)
+        except BaseException:
+            self.forget_sent_commands()
+            raise
+
+    async def async_key_sequence(
+        self,
+        keys: Iterable[Tuple[str, Optional[str], Optional[bool]]],
+        gap_ms: int = DEFAULT_KEY_GAP_MS,
+    ):
+        """Send `(action, parameter, customize)` keys `gap_ms` apart, as when typed on the remote.
+
+        Each key leaves without waiting for the answer to the previous one, and
+        the whole sequence holds the hub so other commands cannot slip in
+        between. Keys are not retried: a late resend would land out of order."""
+        if self.async_client is None:
+            raise RuntimeError(f"{self!r} was created without an async client")
+
+        # Keys are never dropped, and the command sent before them may be repeated afterwards.
+        self.forget_sent_commands()
+        with span("encode"):
+            payloads = [encode_command(action, parameter, customize) for action, parameter, customize in keys]
+        _LOGGER.debug(f"Sending key sequence {payloads}")
+        deadline = current_deadline()
+        trace = current_trace()
+        queued = time.monotonic()
+
+        async def send():
+            tasks = []
+            try:
+                with activate(trace):
+                    add_span("hub_queue", queued, hub_id=self.hub_id)
+                    for index, payload in enumerate(payloads):
+                        if index:
+                            await asyncio.sleep(gap_ms / 1000)
+                        tasks.append(asyncio.ensure_future(
+                            self.async_client.post(f"devices/{self.id}/commands", json=payload, retry_policy=NO_RETRY, deadline=deadline, stats=self._stats(), remote_id=self.id)
+                        ))
+                    return await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        if self.dispatcher is None:
+            await send()
+            return
+
+        await self.dispatcher.submit(self.hub_id, send)
+
+    def as_dict(self) -> dict:
+        """Return the device fields as in the SwitchBot device list, accepted back by create."""
+        return {
+            "device_id": self.id,
+            "device_name": self.name,
+            "remote_type": self.type,
+            "hub_device_id": self.hub_id,
+        }
 
     def __repr__(self):
         name = "Remote" if self.type is None else self.type
@@ -58,11 +184,19 @@ class Remote:
         return f"{name}(id={self.id})"
 
 
+TURN_COMMANDS = {"on": "turnOn", "off": "turnOff"}
+
+
 class SupportedRemote(Remote):
     def turn(self, state: str):
         state = state.lower()
         assert state in ("on", "off")
-        self.command(humps.camelize(f"turn_{state}"))
+        self.command(TURN_COMMANDS[state])
+
+    async def async_turn(self, state: str):
+        state = state.lower()
+        assert state in ("on", "off")
+        await self.async_command(TURN_COMMANDS[state])
 
 
 class OtherRemote(Remote):
@@ -70,3 +204,6 @@ class OtherRemote(Remote):
 
     def command(self, action: str, parameter: Optional[str] = None, customize: Optional[bool] = False):
         super().command(action, parameter, customize)
+
+    async def async_command(self, action: str, parameter: Optional[str] = None, customize: Optional[bool] = False):
+        await super().async_command(action, parameter, customize)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+DEFAULT_REQUEST_LOG_SIZE = 100
+
+
+class RequestRecord:
+    """A call to the SwitchBot cloud, retries included, as kept in the RequestLog."""
+
+    __slots__ = (
+        "seq",
+        "timestamp",
+        "method",
+        "path",
+        "remote_id",
+        "http_status",
+        "status_code",
+        "retries",
+        "queue_wait_s",
+        "latency_s",
+        "error",
+    )
+
+    def __init__(self):
+        self.seq = 0
+        self.reset(0, 0.0, "", "", None)
+
+    def reset(self, seq: int, timestamp: float, method: str, path: str, remote_id: Optional[str]):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.method = method
+        self.path = path
+        self.remote_id = remote_id
+        self.http_status: Optional[int] = None
+        self.status_code: Optional[int] = None
+        self.retries = 0
+        self.queue_wait_s = 0.0
+        self.latency_s: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat(),
+            "method": self.method,
+            "path": self.path,
+            "remote_id": self.remote_id,
+            "http_status": self.http_status,
+            "status_code": self.status_code,
+            "retries": self.retries,
+            "queue_wait_ms": round(self.queue_wait_s * 1000),
+            "latency_ms": None if self.latency_s is None else round(self.latency_s * 1000),
+            "error": self.error,
+        }
+
+
+class RequestLog:
+    """The last `size` calls to the SwitchBot cloud, for the diagnostics.
+
+    The records are allocated once and reused in turn, logging a call only
+    overwrites the fields of the oldest one. Calls still running are listed
+    without a latency."""
+
+    def __init__(self, size: int = DEFAULT_REQUEST_LOG_SIZE):
+        self.size = size
+
+        self._records = [RequestRecord() for _ in range(size)]
+        self._seq = 0
+
+    def start(self, method: str, path: str, remote_id: Optional[str] = None) -> RequestRecord:
+        """Take the oldest record for a call starting now."""
+        self._seq += 1
+        record = self._records[self._seq % self.size]
+        record.reset(self._seq, time.time(), method, path, remote_id)
+        return record
+
+    def finish(
+        self,
+        record: RequestRecord,
+        seq: int,
+        latency_s: float,
+        attempts: int,
+        http_status: Optional[int] = None,
+        status_code: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """Complete the record of call `seq`, unless newer calls took it over already."""
+        if record.seq != seq:
+            return
+        record.latency_s = latency_s
+        record.retries = attempts - 1
+        record.http_status = http_status
+        record.status_code = status_code
+        record.error = None if error is None else type(error).__name__
+
+    def as_list(self, remote_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the logged calls oldest first, only those to `remote_id` if given."""
+        records = sorted((record for record in self._records if record.seq), key=lambda record: record.seq)
+        return [
+            record.as_dict()
+            for record in records
+            if remote_id is None or record.remote_id == remote_id
+        ]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional, Tuple, Type
+
+import aiohttp
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY_MS = 500
+DEFAULT_MAX_DELAY_MS = 8000
+DEFAULT_RETRY_BUDGET_S = 15
+
+RETRY_HTTP_STATUSES = frozenset({429, 500, 502, 503, 504})
+# 190: device internal error, usually gone on the next try.
+RETRY_STATUS_CODES = frozenset({190})
+RETRY_EXCEPTIONS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds to wait from a Retry-After header, in seconds or HTTP date form."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RetryPolicy:
+    """Decide which failed calls are retried and how long to wait in between.
+
+    Errors are classified by HTTP status, by the SwitchBot `status_code` in
+    the response body and by exception type. Waits grow exponentially with
+    jitter, a `Retry-After` from the server is honored, and no retry is
+    scheduled past the total time budget of the request. Subclass and
+    override `is_retryable` or `delay` to change the behavior."""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay_ms: int = DEFAULT_BASE_DELAY_MS,
+        max_delay_ms: int = DEFAULT_MAX_DELAY_MS,
+        budget_s: float = DEFAULT_RETRY_BUDGET_S,
+        retry_http_statuses: FrozenSet[int] = RETRY_HTTP_STATUSES,
+        retry_status_codes: FrozenSet[int] = RETRY_STATUS_CODES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = RETRY_EXCEPTIONS,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.budget_s = budget_s
+        self.retry_http_statuses = retry_http_statuses
+        self.retry_status_codes = retry_status_codes
+        self.retry_exceptions = retry_exceptions
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, self.retry_exceptions):
+            return True
+        http_status = getattr(error, "http_status", None)
+        if http_status is not None and http_status in self.retry_http_statuses:
+            return True
+        status_code = getattr(error, "status_code", None)
+        return status_code is not None and status_code in self.retry_status_codes
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the attempt following `attempt` (1-based)."""
+        ceiling = min(self.max_delay_ms, self.base_delay_ms * 2 ** (attempt - 1)) / 1000
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
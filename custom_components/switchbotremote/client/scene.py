@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+from .client import AsyncSwitchBotClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Scene:
+    """A manual scene of the SwitchBot app, run by the cloud in a single call."""
+
+    def __init__(self, id: str, name: Optional[str] = None, async_client: Optional[AsyncSwitchBotClient] = None):
+        self.async_client = async_client
+
+        self.id: str = id
+        self.name: Optional[str] = name
+
+    def as_dict(self) -> dict:
+        """Return the scene fields as in the SwitchBot scene list, accepted back by restore_scenes."""
+        return {"scene_id": self.id, "scene_name": self.name}
+
+    @property
+    def available(self) -> bool:
+        """Whether the scene can currently be run through the SwitchBot cloud."""
+        return self.async_client is None or not self.async_client.circuit_breaker.is_open
+
+    async def async_execute(self):
+        if self.async_client is None:
+            raise RuntimeError(f"{self!r} was created without an async client")
+
+        _LOGGER.debug(f"Executing scene {self.name}")
+        await self.async_client.post(f"scenes/{self.id}/execute")
+
+    def __repr__(self):
+        return f"Scene(id={self.id})"
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import math
+from collections import deque
+from typing import Deque, Iterator, List, Optional
+
+from homeassistant.exceptions import HomeAssistantError
+
+DEFAULT_CONNECT_TIMEOUT_S = 5
+DEFAULT_MIN_READ_TIMEOUT_S = 3
+DEFAULT_MAX_READ_TIMEOUT_S = 15
+DEFAULT_COMMAND_TIMEOUT_S = 30
+DEFAULT_P95_MULTIPLIER = 2
+DEFAULT_LATENCY_WINDOW = 100
+# Below this many samples the p95 says little, the max read timeout is used.
+MIN_LATENCY_SAMPLES = 20
+# A timeout firing this close to the deadline is taken as the deadline's.
+DEADLINE_TIMER_SLACK_S = 0.01
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("switchbot_deadline", default=None)
+
+
+class DeadlineExceededError(HomeAssistantError):
+    """Exception raised when a call would end past the deadline of the service call"""
+
+
+class LatencyWindow:
+    """The last `size` latencies of the calls to the SwitchBot cloud."""
+
+    def __init__(self, size: int = DEFAULT_LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency_s: float):
+        self._samples.append(latency_s)
+        self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the `q` (0-100) percentile of the window, None if it is empty."""
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, math.ceil(q / 100 * len(self._sorted)) - 1)]
+
+
+class AdaptiveTimeout:
+    """Connect and read timeouts of the calls to the SwitchBot cloud.
+
+    The read timeout follows the observed p95 latency times `multiplier`,
+    kept between `min_read_s` and `max_read_s`. A command sent for a service
+    call, hub queue and retries included, ends within `command_s`."""
+
+    def __init__(
+        self,
+        connect_s: float = DEFAULT_CONNECT_TIMEOUT_S,
+        min_read_s: float = DEFAULT_MIN_READ_TIMEOUT_S,
+        max_read_s: float = DEFAULT_MAX_READ_TIMEOUT_S,
+        multiplier: float = DEFAULT_P95_MULTIPLIER,
+        window: int = DEFAULT_LATENCY_WINDOW,
+        command_s: float = DEFAULT_COMMAND_TIMEOUT_S,
+    ):
+        self.connect_s = connect_s
+        self.min_read_s = min_read_s
+        self.max_read_s = max(min_read_s, max_read_s)
+        self.multiplier = multiplier
+        self.command_s = command_s
+        self.latencies = LatencyWindow(window)
+
+    @property
+    def read_s(self) -> float:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return self.max_read_s
+        return min(self.max_read_s, max(self.min_read_s, self.latencies.percentile(95) * self.multiplier))
+
+    def record(self, latency_s: float):
+        """Record the latency of a call the server answered."""
+        self.latencies.record(latency_s)
+
+
+@contextlib.contextmanager
+def deadline(timeout_s: Optional[float]) -> Iterator[None]:
+    """Give the calls to the SwitchBot cloud made within the block `timeout_s` seconds in total.
+
+    An enclosing deadline that ends earlier still applies."""
+    if timeout_s is None:
+        yield
+        return
+
+    end = asyncio.get_running_loop().time() + timeout_s
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(current, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Return the event loop time by which the current calls must be done, if any."""
+    return _deadline.get()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("switchbot_trace", default=None)
+
+
+class Span:
+    """A timed stage of a traced command."""
+
+    __slots__ = ("name", "start", "end", "attrs")
+
+    def __init__(self, name: str, start: float, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attrs = attrs
+
+
+class Trace:
+    """The spans of a command, from the service call to the last HTTP response.
+
+    The trace is exported once every holder released it, so a command sent
+    in the background still ends up in the trace of the call that queued it."""
+
+    def __init__(self, name: str, context_id: Optional[str], export: Callable[[Trace], None]):
+        self.name = name
+        self.context_id = context_id
+        self.timestamp = time.time()
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+
+        self._export = export
+        self._holders = 0
+
+    def hold(self):
+        self._holders += 1
+
+    def release(self):
+        self._holders -= 1
+        if self._holders == 0:
+            self.end = time.monotonic()
+            self._export(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "context_id": self.context_id,
+            "timestamp": self.timestamp,
+            "duration_ms": None if self.end is None else round((self.end - self.start) * 1000, 1),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": round((span.start - self.start) * 1000, 1),
+                    "duration_ms": None if span.end is None else round((span.end - span.start) * 1000, 1),
+                    **span.attrs,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+class Tracer:
+    """Opt-in tracing of the commands sent to the SwitchBot cloud.
+
+    Without `export` tracing is off, and the spans cost a context variable
+    lookup each."""
+
+    def __init__(self, export: Optional[Callable[[Trace], None]] = None):
+        self.export = export
+
+    @property
+    def enabled(self) -> bool:
+        return self.export is not None
+
+    @contextlib.contextmanager
+    def trace(self, name: str, context_id: Optional[str] = None) -> Iterator[Optional[Trace]]:
+        """Trace the block, or add to the trace it runs in already."""
+        current = _trace.get()
+        if current is not None or not self.enabled:
+            yield current
+            return
+
+        trace = Trace(name, context_id, self.export)
+        trace.hold()
+        token = _trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _trace.reset(token)
+            trace.release()
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the running command, if it is traced."""
+    return _trace.get()
+
+
+@contextlib.contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[None]:
+    """Add the spans of the block to `trace`, captured where the work was queued.
+
+    With None the block is not traced, even if it runs in a traced context."""
+    token = _trace.set(trace)
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time the block as a span of the current trace, if any."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(name, time.monotonic(), attrs)
+    trace.spans.append(current)
+    try:
+        yield current
+    except BaseException as err:
+        current.attrs["error"] = type(err).__name__
+        raise
+    finally:
+        current.end = time.monotonic()
+
+
+def add_span(name: str, start: float, **attrs: Any):
+    """Add a span that began at `start`, a time.monotonic() value, and ends now."""
+    if (trace := _trace.get()) is None:
+        return
+
+    current = Span(name, start, attrs)
+    current.end = time.monotonic()
+    trace.spans.append(current)
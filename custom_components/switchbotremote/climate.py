@@ -1,7 +1,8 @@
 import logging
+from dataclasses import dataclass
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.core import Event, HomeAssistant, callback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.components.climate.const import (
     HVACMode,
@@ -16,6 +17,8 @@ from homeassistant.const import UnitOfTemperature
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from .client.remote import SupportedRemote
+from .client.tracing import activate
+from .entity import SwitchBotRemoteEntity
 
 from .const import (
     DOMAIN,
@@ -29,8 +32,10 @@ from .const import (
     CONF_TEMP_STEP,
     CONF_HVAC_MODES,
     CONF_OVERRIDE_OFF_COMMAND,
+    CONF_DEBOUNCE,
+    CONF_OPTIMISTIC,
 )
-from .config_flow import DEFAULT_HVAC_MODES
+from .config_flow import DEFAULT_DEBOUNCE_MS, DEFAULT_HVAC_MODES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,7 +59,33 @@ DEFAULT_MIN_TEMP = 16
 DEFAULT_MAX_TEMP = 30
 
 
-class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
+@dataclass(frozen=True)
+class AcState:
+    """What the air conditioner is told to do."""
+
+    power: bool
+    mode: HVACMode
+    fan_mode: str
+    temperature: int
+
+
+def ac_command(sent: AcState | None, desired: AcState, override_off_command: bool = True) -> tuple[str, str] | None:
+    """Return the single command bringing the unit from `sent` to `desired`, None if there is nothing to send.
+
+    `sent` is None when the state of the unit is unknown."""
+    if not desired.power:
+        if sent is not None and not sent.power:
+            return None
+        if override_off_command:
+            return ("turnOff", "default")
+        return ("setAll", f"{desired.temperature},{HVAC_REMOTE_MODES[desired.mode]},{FAN_REMOTE_MODES[desired.fan_mode]},off")
+
+    if desired == sent:
+        return None
+    return ("setAll", f"{desired.temperature},{HVAC_REMOTE_MODES[desired.mode]},{FAN_REMOTE_MODES[desired.fan_mode]},on")
+
+
+class SwitchBotRemoteClimate(SwitchBotRemoteEntity, ClimateEntity, RestoreEntity):
     _attr_has_entity_name = False
     _attr_force_update = True
 
@@ -82,6 +113,10 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
         self._min_temp = options.get(CONF_TEMP_MIN, DEFAULT_MIN_TEMP)
         self._power_sensor = options.get(CONF_POWER_SENSOR, None)
         self._override_off_command = options.get(CONF_OVERRIDE_OFF_COMMAND, True)
+        self._debounce_ms = options.get(CONF_DEBOUNCE, DEFAULT_DEBOUNCE_MS)
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
+        self._cancel_debounce = None
+        self._sent_state: AcState | None = None
 
         self._fan_mode = FAN_AUTO
         self._fan_modes = [
@@ -203,50 +238,107 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
             'last_on_operation': self._last_on_operation
         }
 
-    def turn_off(self):
+    async def async_turn_off(self):
         """Turn off."""
-        self.set_hvac_mode(HVACMode.OFF)
+        await self.async_set_hvac_mode(HVACMode.OFF)
 
-    def turn_on(self):
+    async def async_turn_on(self):
         """Turn on."""
-        self.set_hvac_mode(self._last_on_operation or HVACMode.COOL)
+        await self.async_set_hvac_mode(self._last_on_operation or HVACMode.COOL)
 
     def set_supported_features(self):
         if self.hvac_mode == HVACMode.DRY or self.hvac_mode == HVACMode.FAN_ONLY:
             # switchbot api accept only 25 in DRY Mode
-            self.set_temperature(temperature=25)
+            self._target_temperature = 25
             self._supported_features = ClimateEntityFeature.TURN_OFF | ClimateEntityFeature.TURN_ON | ClimateEntityFeature.FAN_MODE
         else:
             self._supported_features = ClimateEntityFeature.TURN_OFF | ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.FAN_MODE
 
-    def set_temperature(self, **kwargs):
+    async def async_set_temperature(self, **kwargs):
         self._target_temperature = kwargs.get("temperature")
 
-        self._update_remote()
+        await self._async_update_remote()
 
-    def set_hvac_mode(self, hvac_mode):
+    async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
-        if hvac_mode == HVACMode.OFF and self._override_off_command:
-            self.sb.turn("off")
-            self._is_on = False
-        else:
+        if hvac_mode != HVACMode.OFF:
             self._last_on_operation = hvac_mode
 
-        self._is_on = True
+        self._is_on = hvac_mode != HVACMode.OFF
         self._hvac_mode = hvac_mode
-        self._update_remote()
+        await self._async_update_remote()
 
-    def set_fan_mode(self, fan_mode):
+    async def async_set_fan_mode(self, fan_mode):
         self._fan_mode = fan_mode
-        self._update_remote()
+        await self._async_update_remote()
 
-    def _update_remote(self):
+    async def _async_update_remote(self):
         self.set_supported_features()
-        if (self._hvac_mode != HVACMode.OFF and self._override_off_command):
-            self.sb.command(
-                "setAll",
-                f"{int(self.target_temperature)},{HVAC_REMOTE_MODES[self.hvac_mode]},{FAN_REMOTE_MODES[self.fan_mode]},{self.power_state}",
-            )
+        with self.async_trace():
+            if not self._debounce_ms and not self._optimistic:
+                await self._async_send_remote()
+                return
+
+            # Show the change right away, the command goes out with the final
+            # state once no other change came in for the debounce window.
+            self.async_write_ha_state()
+            if not self._debounce_ms:
+                self._async_send_remote_in_background()
+                return
+
+            self._async_cancel_debounce()
+            # The trace ends with this call, the delayed send is not traced.
+            with activate(None):
+                self._cancel_debounce = async_call_later(
+                    self.hass, self._debounce_ms / 1000, self._async_debounce_done)
+
+    @callback
+    def _async_debounce_done(self, _now):
+        self._cancel_debounce = None
+        self._async_send_remote_in_background()
+
+    @callback
+    def _async_cancel_debounce(self):
+        if self._cancel_debounce is not None:
+            self._cancel_debounce()
+            self._cancel_debounce = None
+
+    @callback
+    def _async_send_remote_in_background(self):
+        attempted = self._desired_state()
+
+        @callback
+        def rollback():
+            # Leave alone a state changed again since.
+            if self._sent_state is None or self._desired_state() != attempted:
+                return
+            self._is_on = self._sent_state.power
+            self._hvac_mode = self._sent_state.mode
+            self._fan_mode = self._sent_state.fan_mode
+            self._target_temperature = self._sent_state.temperature
+            self.set_supported_features()
+            self.async_write_ha_state()
+
+        self.async_send_in_background(self._async_send_remote, rollback)
+
+    def _desired_state(self) -> AcState:
+        return AcState(
+            power=self._hvac_mode != HVACMode.OFF,
+            mode=self._hvac_mode,
+            fan_mode=self._fan_mode,
+            temperature=int(self._target_temperature),
+        )
+
+    async def _async_send_remote(self):
+        desired = self._desired_state()
+        command = ac_command(self._sent_state, desired, self._override_off_command)
+        if command is None:
+            _LOGGER.debug(f"{self.sb} already in {desired}, nothing to send")
+            return
+
+        with self.async_deadline():
+            await self.sb.async_command(*command)
+        self._sent_state = desired
 
     @callback
     def _async_update_temp(self, state):
@@ -292,9 +384,12 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
                 if state.state == STATE_OFF:
                     self._is_on = False
                     self._hvac_mode = HVACMode.OFF
+                    self._sent_state = self._desired_state()
                 elif state.state == STATE_ON:
                     self._is_on = True
                     self._hvac_mode = self._last_on_operation
+                    # Turned on from elsewhere, the settings in use are unknown.
+                    self._sent_state = None
         except ValueError as ex:
             _LOGGER.error("Unable to update from power sensor: %s", ex)
 
@@ -304,6 +399,7 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
         await self.async_update_ha_state(force_refresh=True)
 
@@ -311,6 +407,8 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
         """Run when entity about to be added."""
         await super().async_added_to_hass()
 
+        self.async_on_remove(self._async_cancel_debounce)
+
         last_state = await self.async_get_last_state()
 
         if last_state is not None:
@@ -347,11 +445,11 @@ class SwitchBotRemoteClimate(ClimateEntity, RestoreEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes = hass.data[DOMAIN][entry.entry_id]
+    remotes = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_CLIMATE_TYPES)
 
     entities = [
         SwitchBotRemoteClimate(remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_CLIMATE_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)
@@ -13,22 +13,50 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.selector import selector
 
-from .client import SwitchBot, switchbot_host
+from . import async_get_switchbot, async_keep_validated_devices
+from .client import switchbot_host
+from .client.concurrency import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_QUEUE
+from .client.dedup import DEFAULT_DEDUP_WINDOW_S
+from .client.dispatcher import DEFAULT_COMMAND_GAP_MS
+from .client.hedge import DEFAULT_HEDGE_BUDGET_PERCENT
+from .client.remote import DEFAULT_KEY_GAP_MS
+from .client.ratelimit import DEFAULT_DAILY_QUOTA, DEFAULT_QUOTA_RESERVE_PERCENT
+from .client.retry import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BUDGET_S
+from .client.timeouts import DEFAULT_COMMAND_TIMEOUT_S, DEFAULT_MAX_READ_TIMEOUT_S, DEFAULT_MIN_READ_TIMEOUT_S
+from .services import MACRO_STEPS_SCHEMA
 from .const import (
     AIR_CONDITIONER_CLASS,
     CAMERA_CLASS,
     CLASS_BY_TYPE,
+    CONF_COMMAND_GAP,
     CONF_CUSTOMIZE_COMMANDS,
+    CONF_DAILY_QUOTA,
+    CONF_DEDUP_WINDOW,
+    CONF_DEBOUNCE,
+    CONF_HEDGE_BUDGET,
     CONF_HUMIDITY_SENSOR,
     CONF_HVAC_MODES,
+    CONF_KEY_GAP,
+    CONF_MACROS,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_QUEUE,
+    CONF_NON_BLOCKING_BUTTONS,
     CONF_OFF_COMMAND,
+    CONF_OPTIMISTIC,
     CONF_ON_COMMAND,
     CONF_OVERRIDE_OFF_COMMAND,
     CONF_POWER_SENSOR,
+    CONF_QUOTA_RESERVE,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RETRY_BUDGET,
     CONF_TEMP_MAX,
     CONF_TEMP_MIN,
     CONF_TEMP_STEP,
     CONF_TEMPERATURE_SENSOR,
+    CONF_TIMEOUT_MAX,
+    CONF_COMMAND_TIMEOUT,
+    CONF_TIMEOUT_MIN,
+    CONF_TRACE,
     CONF_WITH_BRIGHTNESS,
     CONF_WITH_ION,
     CONF_WITH_SPEED,
@@ -39,6 +67,9 @@ from .const import (
     LIGHT_CLASS,
     MEDIA_CLASS,
     OTHERS_CLASS,
+    TRACE_EVENT,
+    TRACE_FILE,
+    TRACE_OFF,
     VACUUM_CLASS,
     WATER_HEATER_CLASS,
 )
@@ -52,6 +83,9 @@ DEFAULT_HVAC_MODES = [
     HVACMode.OFF,
 ]
 
+# Off unless set: debounced service calls return before the command is sent.
+DEFAULT_DEBOUNCE_MS = 0
+
 HVAC_MODES = [
     {"label": "Auto", "value": str(HVACMode.AUTO)},
     {"label": "Cool", "value": str(HVACMode.COOL)},
@@ -82,57 +116,91 @@ STEP_CONFIGURE_DEVICE = {
         vol.Optional(CONF_TEMP_MAX, default=x.get(CONF_TEMP_MAX, 30)): int,
         vol.Optional(CONF_TEMP_STEP, default=x.get(CONF_TEMP_STEP, 1.0)): selector({"number": {"min": 1.0, "max": 5.0, "step": 1.0, "mode": "slider"}}),
         vol.Optional(CONF_HVAC_MODES, description={"suggested_value": x.get(CONF_HVAC_MODES, DEFAULT_HVAC_MODES)}): vol.All(selector({"select": {"multiple": True, "options": HVAC_MODES}})),
+        vol.Optional(CONF_DEBOUNCE, default=x.get(CONF_DEBOUNCE, DEFAULT_DEBOUNCE_MS)): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     MEDIA_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_POWER_SENSOR, description={"suggested_value": x.get(CONF_POWER_SENSOR)}): selector({"entity": {"filter": {"domain": ["binary_sensor", "input_boolean", "light", "sensor", "switch"]}}}),
+        vol.Optional(CONF_KEY_GAP, default=x.get(CONF_KEY_GAP, DEFAULT_KEY_GAP_MS)): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     FAN_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_POWER_SENSOR, description={"suggested_value": x.get(CONF_POWER_SENSOR)}): selector({"entity": {"filter": {"domain": ["binary_sensor", "input_boolean", "light", "sensor", "switch"]}}}),
         vol.Optional(CONF_WITH_SPEED, default=x.get(CONF_WITH_SPEED, False)): bool,
         vol.Optional(CONF_WITH_ION, default=x.get(CONF_WITH_ION, False)): bool,
         vol.Optional(CONF_WITH_TIMER, default=x.get(CONF_WITH_TIMER, False)): bool,
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     LIGHT_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_POWER_SENSOR, description={"suggested_value": x.get(CONF_POWER_SENSOR)}): selector({"entity": {"filter": {"domain": ["binary_sensor", "input_boolean", "light", "sensor", "switch"]}}}),
         vol.Optional(CONF_WITH_BRIGHTNESS, default=x.get(CONF_WITH_BRIGHTNESS, False)): bool,
         vol.Optional(CONF_WITH_TEMPERATURE, default=x.get(CONF_WITH_TEMPERATURE, False)): bool,
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     CAMERA_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     VACUUM_CLASS: lambda x: vol.Schema({
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     WATER_HEATER_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_POWER_SENSOR, description={"suggested_value": x.get(CONF_POWER_SENSOR)}): selector({"entity": {"filter": {"domain": ["binary_sensor", "input_boolean", "light", "sensor", "switch"]}}}),
         vol.Optional(CONF_TEMPERATURE_SENSOR, description={"suggested_value": x.get(CONF_TEMPERATURE_SENSOR)}): selector({"entity": {"filter": {"domain": "sensor"}}}),
         vol.Optional(CONF_TEMP_MIN, default=x.get(CONF_TEMP_MIN, 40)): int,
         vol.Optional(CONF_TEMP_MAX, default=x.get(CONF_TEMP_MAX, 65)): int,
+        vol.Optional(CONF_OPTIMISTIC, default=x.get(CONF_OPTIMISTIC, False)): bool,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
     OTHERS_CLASS: lambda x: vol.Schema({
         vol.Optional(CONF_POWER_SENSOR, description={"suggested_value": x.get(CONF_POWER_SENSOR)}): selector({"entity": {"filter": {"domain": ["binary_sensor", "input_boolean", "light", "sensor", "switch"]}}}),
         vol.Optional(CONF_ON_COMMAND, default=x.get(CONF_ON_COMMAND, "")): str,
         vol.Optional(CONF_OFF_COMMAND, default=x.get(CONF_OFF_COMMAND, "")): str,
         vol.Optional(CONF_CUSTOMIZE_COMMANDS, default=x.get(CONF_CUSTOMIZE_COMMANDS, [])): selector({"select": {"multiple": True, "custom_value": True, "options": []}}),
+        vol.Optional(CONF_NON_BLOCKING_BUTTONS, default=x.get(CONF_NON_BLOCKING_BUTTONS, False)): bool,
     }),
 }
 
+STEP_SETTINGS = lambda x: vol.Schema({
+    vol.Optional(CONF_COMMAND_GAP, default=x.get(CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP_MS)): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+    vol.Optional(CONF_DAILY_QUOTA, default=x.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA)): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_QUOTA_RESERVE, default=x.get(CONF_QUOTA_RESERVE, DEFAULT_QUOTA_RESERVE_PERCENT)): selector({"number": {"min": 0, "max": 90, "step": 5, "unit_of_measurement": "%", "mode": "slider"}}),
+    vol.Optional(CONF_RETRY_ATTEMPTS, default=x.get(CONF_RETRY_ATTEMPTS, DEFAULT_MAX_ATTEMPTS)): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+    vol.Optional(CONF_RETRY_BUDGET, default=x.get(CONF_RETRY_BUDGET, DEFAULT_RETRY_BUDGET_S)): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+    vol.Optional(CONF_DEDUP_WINDOW, default=x.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW_S)): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+    vol.Optional(CONF_TIMEOUT_MIN, default=x.get(CONF_TIMEOUT_MIN, DEFAULT_MIN_READ_TIMEOUT_S)): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+    vol.Optional(CONF_TIMEOUT_MAX, default=x.get(CONF_TIMEOUT_MAX, DEFAULT_MAX_READ_TIMEOUT_S)): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+    vol.Optional(CONF_COMMAND_TIMEOUT, default=x.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT_S)): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+    vol.Optional(CONF_MAX_CONCURRENCY, default=x.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+    vol.Optional(CONF_MAX_QUEUE, default=x.get(CONF_MAX_QUEUE, DEFAULT_MAX_QUEUE)): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+    vol.Optional(CONF_HEDGE_BUDGET, default=x.get(CONF_HEDGE_BUDGET, DEFAULT_HEDGE_BUDGET_PERCENT)): selector({"number": {"min": 0, "max": 20, "step": 1, "unit_of_measurement": "%", "mode": "slider"}}),
+    vol.Optional(CONF_TRACE, default=x.get(CONF_TRACE, TRACE_OFF)): selector({"select": {"options": [TRACE_OFF, TRACE_EVENT, TRACE_FILE], "translation_key": CONF_TRACE}}),
+})
+
+STEP_MACRO = vol.Schema({
+    vol.Required("name"): str,
+    vol.Optional("steps"): selector({"object": {}}),
+})
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    switchbot = SwitchBot(
-        token=data["token"], 
-        secret=data["secret"], 
-        host=data.get("host", switchbot_host)
-    )
+    switchbot = async_get_switchbot(hass, data)
 
     try:
-        remotes = await hass.async_add_executor_job(switchbot.remotes)
+        remotes = await switchbot.async_remotes()
         _LOGGER.debug(f"Found remotes: {remotes}")
+        async_keep_validated_devices(hass, data, switchbot.catalog)
         return {"title": data["name"], "remotes": remotes}
     except Exception as exception:
         raise ConfigEntryAuthFailed from exception
@@ -203,11 +271,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
         self.data = config_entry.data
-        self.sb = SwitchBot(
-            token=self.data["token"],
-            secret=self.data["secret"],
-            host=self.data.get("host", switchbot_host)
-        )
+        self.sb = None
         self.discovered_devices = []
         self.selected_device = None
 
@@ -215,12 +279,56 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Manage the options."""
+        return self.async_show_menu(step_id="init", menu_options=["select_device", "settings", "macro"])
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Handle the account wide settings."""
+        if user_input is not None:
+            new_data = self.config_entry.data.copy()
+            new_data.update(user_input)
+            self.hass.config_entries.async_update_entry(
+                self.config_entry,
+                data=new_data,
+            )
+            return self.async_create_entry(title=self.data["name"], data=user_input)
+
+        return self.async_show_form(step_id="settings", data_schema=STEP_SETTINGS(self.config_entry.data))
+
+    async def async_step_macro(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Add, replace or, when given no steps, delete a stored macro."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            macros = dict(self.config_entry.data.get(CONF_MACROS, {}))
+            try:
+                if user_input.get("steps"):
+                    macros[user_input["name"]] = MACRO_STEPS_SCHEMA(user_input["steps"])
+                else:
+                    macros.pop(user_input["name"], None)
+            except vol.Invalid as err:
+                _LOGGER.debug(f"Invalid macro {user_input['name']}: {err}")
+                errors["steps"] = "invalid_macro"
+            else:
+                new_data = self.config_entry.data.copy()
+                new_data[CONF_MACROS] = macros
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data=new_data,
+                )
+                return self.async_create_entry(title=self.data["name"], data=user_input)
+
+        return self.async_show_form(step_id="macro", data_schema=STEP_MACRO, errors=errors)
+
+    async def async_step_select_device(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Pick the device to configure."""
         if user_input is not None:
             self.selected_device = user_input["selected_device"]
             return await self.async_step_edit_device()
 
+        if self.sb is None:
+            self.sb = async_get_switchbot(self.hass, self.data, self.config_entry.entry_id)
+
         try:
-            self.discovered_devices = await self.hass.async_add_executor_job(self.sb.remotes)
+            self.discovered_devices = await self.sb.async_remotes()
         except Exception as exception:
             raise ConfigEntryAuthFailed from exception
 
@@ -228,7 +336,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         for remote in self.discovered_devices:
             devices[remote.id] = remote.name
 
-        return self.async_show_form(step_id="init", data_schema=vol.Schema({vol.Required("selected_device"): vol.In(devices)}))
+        return self.async_show_form(step_id="select_device", data_schema=vol.Schema({vol.Required("selected_device"): vol.In(devices)}))
 
     async def async_step_edit_device(self, user_input=None):
         """Handle editing a device."""
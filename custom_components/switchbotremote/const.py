@@ -19,6 +19,39 @@ CONF_WITH_TEMPERATURE = "with_temperature"
 CONF_ON_COMMAND = "on_command"
 CONF_OFF_COMMAND = "off_command"
 CONF_OVERRIDE_OFF_COMMAND = "override_off_command"
+CONF_DEBOUNCE = "debounce"
+CONF_KEY_GAP = "key_gap"
+CONF_OPTIMISTIC = "optimistic"
+CONF_NON_BLOCKING_BUTTONS = "non_blocking_buttons"
+
+"""Account settings"""
+CONF_COMMAND_GAP = "command_gap"
+CONF_DAILY_QUOTA = "daily_quota"
+CONF_QUOTA_RESERVE = "quota_reserve"
+CONF_RETRY_ATTEMPTS = "retry_attempts"
+CONF_RETRY_BUDGET = "retry_budget"
+CONF_DEDUP_WINDOW = "dedup_window"
+CONF_TIMEOUT_MIN = "timeout_min"
+CONF_TIMEOUT_MAX = "timeout_max"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_MAX_QUEUE = "max_queue"
+CONF_HEDGE_BUDGET = "hedge_budget"
+CONF_TRACE = "trace"
+CONF_MACROS = "macros"
+
+"""Trace export"""
+TRACE_OFF = "off"
+TRACE_EVENT = "event"
+TRACE_FILE = "file"
+TRACE_FILENAME = f"{DOMAIN}_trace.jsonl"
+
+"""Services"""
+SERVICE_RUN_MACRO = "run_macro"
+
+"""Events"""
+EVENT_COMMAND_RESULT = f"{DOMAIN}_command_result"
+EVENT_TRACE = f"{DOMAIN}_trace"
 
 """Supported Devices"""
 DIY_AIR_CONDITIONER_TYPE = "DIY Air Conditioner"
@@ -0,0 +1,63 @@
+"""Diagnostics support for SwitchBot Remote IR."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from . import SwitchBotRemoteData
+from .const import DOMAIN
+
+TO_REDACT = {"token", "secret"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: SwitchBotRemoteData = hass.data[DOMAIN][entry.entry_id]
+    switchbot = data.switchbot
+    async_client = switchbot.async_client
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "catalog": {
+            "fresh": switchbot.catalog.fresh,
+            "remotes": [async_redact_data(remote.as_dict(), TO_REDACT) for remote in data.remotes],
+            "scenes": [{"id": scene.id, "name": scene.name} for scene in switchbot.scenes],
+        },
+        "circuit": async_client.circuit_breaker.state.value,
+        "quota": {
+            "daily_quota": async_client.rate_limiter.daily_quota,
+            "used": async_client.rate_limiter.used,
+            "remaining": async_client.rate_limiter.remaining,
+        },
+        "concurrency": async_client.concurrency_limit.as_dict(),
+        "hub_queue": switchbot.dispatcher.as_dict(),
+        "read_timeout_s": switchbot.timeout.read_s,
+        "hedged": async_client.hedge_budget.hedged,
+        "deduplicated": switchbot.dedup.dropped,
+        "metrics": {
+            "account": switchbot.metrics.account.as_dict(),
+            "hubs": {hub_id: stats.as_dict() for hub_id, stats in switchbot.metrics.hubs.items()},
+        },
+        "requests": async_client.request_log.as_list(),
+    }
+
+
+async def async_get_device_diagnostics(hass: HomeAssistant, entry: ConfigEntry, device: dr.DeviceEntry) -> dict[str, Any]:
+    """Return diagnostics for a device."""
+    data: SwitchBotRemoteData = hass.data[DOMAIN][entry.entry_id]
+    device_id = next(identifier for domain, identifier in device.identifiers if domain == DOMAIN)
+    if device_id == entry.entry_id:
+        return await async_get_config_entry_diagnostics(hass, entry)
+
+    switchbot = data.switchbot
+    remote = switchbot.catalog.get(device_id)
+    return {
+        "remote": None if remote is None else async_redact_data(remote.as_dict(), TO_REDACT),
+        "options": async_redact_data(dict(entry.data.get(device_id, {})), TO_REDACT),
+        "metrics": switchbot.metrics.remote(device_id).as_dict(),
+        "requests": switchbot.async_client.request_log.as_list(device_id),
+    }
@@ -0,0 +1,123 @@
+import contextlib
+import logging
+from typing import Any, Awaitable, Callable, ContextManager
+from homeassistant.components import persistent_notification
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+from .client.remote import Remote
+from .client.timeouts import deadline
+from .client.tracing import current_trace, span
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SwitchBotRemoteEntity(Entity):
+    """Base of the entities controlling a SwitchBot remote.
+
+    The entity goes unavailable as soon as the SwitchBot cloud circuit opens,
+    so service calls fail right away instead of waiting on a dead server.
+
+    In optimistic mode commands are sent in the background once the new state
+    is written, the attributes listed in `_optimistic_attrs` are restored if
+    the command finally fails.
+
+    Each command must be sent within the command timeout of the account, or
+    of the enclosing deadline if it ends earlier.
+
+    With tracing on, each command is traced from the service call to the
+    state write, under the id of the context that called it."""
+
+    sb: Remote
+
+    _optimistic: bool = False
+    _optimistic_attrs: tuple[str, ...] = ()
+
+    @property
+    def available(self) -> bool:
+        """Return True if commands can reach the SwitchBot cloud."""
+        return self.sb.available
+
+    async def async_added_to_hass(self):
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+
+        if self.sb.async_client is not None:
+            self.async_on_remove(
+                self.sb.async_client.circuit_breaker.add_listener(self.async_write_ha_state)
+            )
+
+    def async_trace(self) -> ContextManager:
+        """Trace the commands sent within the block, when tracing is on."""
+        if self.sb.async_client is None:
+            return contextlib.nullcontext()
+        return self.sb.async_client.tracer.trace(self.entity_id, None if self._context is None else self._context.id)
+
+    def async_deadline(self) -> ContextManager:
+        """Give the commands sent within the block the command timeout as deadline."""
+        if self.sb.async_client is None:
+            return contextlib.nullcontext()
+        return deadline(self.sb.async_client.timeout.command_s)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        with span("state_write"):
+            super().async_write_ha_state()
+
+    async def send_command(self, *args):
+        with self.async_trace(), self.async_deadline():
+            await self.sb.async_command(*args)
+
+    def _optimistic_state(self) -> dict[str, Any]:
+        return {attr: getattr(self, attr) for attr in self._optimistic_attrs}
+
+    async def async_send(self, send: Callable[[], Awaitable[Any]], update: Callable[[], None]):
+        """Run `send` and apply its effect on the entity with `update`, right away in optimistic mode."""
+        with self.async_trace():
+            if not self._optimistic:
+                await send()
+                update()
+                self.async_write_ha_state()
+                return
+
+            previous = self._optimistic_state()
+            update()
+            applied = self._optimistic_state()
+            self.async_write_ha_state()
+
+            @callback
+            def rollback():
+                # Leave alone a state changed again since, by a newer command or a sensor.
+                if self._optimistic_state() != applied:
+                    return
+                for attr, value in previous.items():
+                    setattr(self, attr, value)
+                self.async_write_ha_state()
+
+            self.async_send_in_background(send, rollback)
+
+    @callback
+    def async_send_in_background(self, send: Callable[[], Awaitable[Any]], rollback: Callable[[], None]):
+        """Run `send` without waiting for it, calling `rollback` and notifying the user if it fails."""
+        # The trace of the caller ends once the command is sent.
+        if (trace := current_trace()) is not None:
+            trace.hold()
+
+        async def run():
+            try:
+                await send()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error(f"Command to {self.name} failed, restoring its previous state: {err}")
+                rollback()
+                persistent_notification.async_create(
+                    self.hass,
+                    f"A command to {self.name} could not be sent, its state was restored: {err}",
+                    title="SwitchBot Remote",
+                    notification_id=f"{DOMAIN}_{self.sb.id}_command_failed",
+                )
+            finally:
+                if trace is not None:
+                    trace.release()
+
+        self.hass.async_create_background_task(run(), f"{DOMAIN} {self.entity_id} command")
@@ -11,6 +11,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.event import async_track_state_change_event
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
 from .const import (
     DOMAIN,
@@ -20,6 +21,7 @@ from .const import (
     DIY_AIR_PURIFIER_TYPE,
     CONF_WITH_SPEED,
     CONF_POWER_SENSOR,
+    CONF_OPTIMISTIC,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,9 +44,10 @@ IR_AIR_PURIFIER_TYPES = [
 ]
 
 
-class SwitchBotRemoteFan(FanEntity, RestoreEntity):
+class SwitchBotRemoteFan(SwitchBotRemoteEntity, FanEntity, RestoreEntity):
     _attr_has_entity_name = False
     _attr_speed_count = len(SPEED_COMMANDS)
+    _optimistic_attrs = ("_state", "_is_on", "_speed", "_is_oscillating")
 
     def __init__(
         self, hass: HomeAssistant, sb: SupportedRemote, options: dict = {}
@@ -62,9 +65,10 @@ class SwitchBotRemoteFan(FanEntity, RestoreEntity):
             if sb.type in IR_AIR_PURIFIER_TYPES
             else SPEED_COMMANDS[0]
         )
-        self._supported_features = 0
+        self._supported_features = FanEntityFeature(0)
 
         self._power_sensor = options.get(CONF_POWER_SENSOR, None)
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
 
         if options.get(CONF_WITH_SPEED, None):
             self._supported_features = FanEntityFeature.SET_SPEED
@@ -72,9 +76,6 @@ class SwitchBotRemoteFan(FanEntity, RestoreEntity):
         if sb.type not in IR_AIR_PURIFIER_TYPES:
             self._supported_features |= FanEntityFeature.OSCILLATE
 
-    async def send_command(self, *args):
-        await self._hass.async_add_executor_job(self.sb.command, *args)
-
     @property
     def device_info(self):
         return DeviceInfo(
@@ -126,31 +127,36 @@ class SwitchBotRemoteFan(FanEntity, RestoreEntity):
             else SPEED_COMMANDS,
             percentage,
         )
-        await self.send_command(speed)
-        self._speed = speed
+        def update():
+            self._speed = speed
+
+        await self.async_send(lambda: self.send_command(speed), update)
 
     async def async_oscillate(self, oscillating: bool) -> None:
         """Oscillate the fan."""
-        await self.send_command("swing")
-        self._is_oscillating = oscillating
+        def update():
+            self._is_oscillating = oscillating
+
+        await self.async_send(lambda: self.send_command("swing"), update)
 
     async def async_turn_on(self, percentage: int = None, preset_mode: str = None, **kwargs):
         """Send the power on command."""
-        await self.send_command("turnOn")
-
-        self._state = STATE_ON
-        self._is_on = True
+        def update():
+            self._state = STATE_ON
+            self._is_on = True
 
-        if percentage is None:
-            percentage = self.percentage
+        await self.async_send(lambda: self.send_command("turnOn"), update)
 
-        await self.async_set_percentage(percentage)
+        if percentage is not None:
+            await self.async_set_percentage(percentage)
 
     async def async_turn_off(self, **kwargs):
         """Send the power on command."""
-        await self.send_command("turnOff")
-        self._state = STATE_OFF
-        self._is_on = False
+        def update():
+            self._state = STATE_OFF
+            self._is_on = False
+
+        await self.async_send(lambda: self.send_command("turnOff"), update)
 
     @callback
     def _async_update_power(self, state):
@@ -176,6 +182,7 @@ class SwitchBotRemoteFan(FanEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
 
     async def async_added_to_hass(self):
@@ -195,11 +202,11 @@ class SwitchBotRemoteFan(FanEntity, RestoreEntity):
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
 ) -> bool:
-    remotes = hass.data[DOMAIN][entry.entry_id]
+    remotes = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_FAN_TYPES)
 
     entities = [
         SwitchBotRemoteFan(hass, remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_FAN_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)
@@ -8,14 +8,16 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, STATE_OFF, STATE_ON
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
-from .const import DOMAIN, IR_LIGHT_TYPES, LIGHT_CLASS, CONF_POWER_SENSOR
+from .const import DOMAIN, IR_LIGHT_TYPES, LIGHT_CLASS, CONF_POWER_SENSOR, CONF_OPTIMISTIC
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class SwitchBotRemoteLight(LightEntity, RestoreEntity):
+class SwitchBotRemoteLight(SwitchBotRemoteEntity, LightEntity, RestoreEntity):
     _attr_has_entity_name = False
+    _optimistic_attrs = ("_state",)
 
     def __init__(self, hass: HomeAssistant, sb: SupportedRemote, options: dict = {}) -> None:
         super().__init__()
@@ -27,9 +29,7 @@ class SwitchBotRemoteLight(LightEntity, RestoreEntity):
         self._brightness = None
 
         self._power_sensor = options.get(CONF_POWER_SENSOR, None)
-
-    async def send_command(self, *args):
-        await self._hass.async_add_executor_job(self.sb.command, *args)
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
 
     @property
     def device_info(self):
@@ -78,13 +78,17 @@ class SwitchBotRemoteLight(LightEntity, RestoreEntity):
 
     async def async_turn_on(self, **kwargs):
         """Send the power on command."""
-        await self.send_command("turnOn")
-        self._state = STATE_ON
+        def update():
+            self._state = STATE_ON
+
+        await self.async_send(lambda: self.send_command("turnOn"), update)
 
     async def async_turn_off(self, **kwargs):
         """Send the power off command."""
-        await self.send_command("turnOff")
-        self._state = STATE_OFF
+        def update():
+            self._state = STATE_OFF
+
+        await self.async_send(lambda: self.send_command("turnOff"), update)
 
     @callback
     def _async_update_power(self, state):
@@ -106,6 +110,7 @@ class SwitchBotRemoteLight(LightEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
 
     async def async_added_to_hass(self):
@@ -122,11 +127,11 @@ class SwitchBotRemoteLight(LightEntity, RestoreEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id]
+    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_LIGHT_TYPES)
 
     entities = [
         SwitchBotRemoteLight(hass, remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_LIGHT_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)
@@ -14,9 +14,10 @@ from homeassistant.const import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.event import async_track_state_change_event
-from .client.remote import SupportedRemote
+from .client.remote import DEFAULT_KEY_GAP_MS, SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
-from .const import DOMAIN, MEDIA_CLASS, IR_MEDIA_TYPES, DIY_PROJECTOR_TYPE, PROJECTOR_TYPE, CONF_POWER_SENSOR
+from .const import DOMAIN, MEDIA_CLASS, IR_MEDIA_TYPES, DIY_PROJECTOR_TYPE, PROJECTOR_TYPE, CONF_POWER_SENSOR, CONF_KEY_GAP, CONF_OPTIMISTIC
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,8 +34,9 @@ IR_PROJECTOR_TYPES = [
 ]
 
 
-class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
+class SwitchbotRemoteMediaPlayer(SwitchBotRemoteEntity, MediaPlayerEntity, RestoreEntity):
     _attr_has_entity_name = False
+    _optimistic_attrs = ("_state", "_source")
 
     def __init__(self, hass: HomeAssistant, sb: SupportedRemote, options: dict = {}) -> None:
         super().__init__()
@@ -47,6 +49,8 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
         self._source = None
 
         self._power_sensor = options.get(CONF_POWER_SENSOR, None)
+        self._key_gap_ms = options.get(CONF_KEY_GAP, DEFAULT_KEY_GAP_MS)
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
 
         self._supported_features = MediaPlayerEntityFeature.TURN_ON | MediaPlayerEntityFeature.TURN_OFF
         self._supported_features |= MediaPlayerEntityFeature.VOLUME_STEP
@@ -67,9 +71,6 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
             self._supported_features |= MediaPlayerEntityFeature.NEXT_TRACK
             self._supported_features |= MediaPlayerEntityFeature.SELECT_SOURCE
 
-    async def send_command(self, *args):
-        await self._hass.async_add_executor_job(self.sb.command, *args)
-
     @property
     def device_info(self):
         return DeviceInfo(
@@ -106,19 +107,18 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
 
     async def async_turn_off(self):
         """Turn the media player off."""
-        await self.send_command("turnOff")
-
-        self._state = STATE_OFF
-        self._source = None
+        def update():
+            self._state = STATE_OFF
+            self._source = None
 
-        self.async_write_ha_state()
+        await self.async_send(lambda: self.send_command("turnOff"), update)
 
     async def async_turn_on(self):
         """Turn the media player off."""
-        await self.send_command("turnOn")
+        def update():
+            self._state = STATE_IDLE if self.sb.type in IR_TRACK_TYPES else STATE_ON
 
-        self._state = STATE_IDLE if self.sb.type in IR_TRACK_TYPES else STATE_ON
-        self.async_write_ha_state()
+        await self.async_send(lambda: self.send_command("turnOn"), update)
 
     async def async_media_previous_track(self):
         """Send previous track command."""
@@ -130,7 +130,6 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
 
     async def async_media_next_track(self):
         """Send next track command."""
-        await self.send_command("Next")
         if self.sb.type in IR_TRACK_TYPES:
             await self.send_command("Next")
         else:
@@ -166,51 +165,58 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
 
     async def async_media_play(self):
         """Play/Resume media"""
-        self._state = STATE_PLAYING
+        def update():
+            self._state = STATE_PLAYING
 
         if self.sb.type in IR_PROJECTOR_TYPES:
-            await self.send_command("PLAY", None, True)
+            await self.async_send(lambda: self.send_command("PLAY", None, True), update)
         else:
-            await self.send_command("Play")
-
-        self.async_write_ha_state()
+            await self.async_send(lambda: self.send_command("Play"), update)
 
     async def async_media_pause(self):
         """Pause media"""
-        self._state = STATE_PAUSED
+        def update():
+            self._state = STATE_PAUSED
 
         if self.sb.type in IR_PROJECTOR_TYPES:
-            await self.send_command("Paused", None, True)
+            await self.async_send(lambda: self.send_command("Paused", None, True), update)
         else:
-            await self.send_command("Pause")
-
-        self.async_write_ha_state()
+            await self.async_send(lambda: self.send_command("Pause"), update)
 
     async def async_media_play_pause(self):
         """Play/Pause media"""
-        self._state = STATE_PLAYING
-        await self.send_command("Play")
-        self.async_write_ha_state()
+        def update():
+            self._state = STATE_PLAYING
+
+        await self.async_send(lambda: self.send_command("Play"), update)
 
     async def async_media_stop(self):
         """Stop media"""
-        self._state = STATE_IDLE
-        await self.send_command("Stop")
-        self.async_write_ha_state()
+        def update():
+            self._state = STATE_IDLE
+
+        await self.async_send(lambda: self.send_command("Stop"), update)
 
     async def async_play_media(self, media_type, media_id, **kwargs):
         """Support channel change through play_media service."""
-        if self._state == STATE_OFF:
-            await self.async_turn_on()
-
         if not media_id.isdigit():
             _LOGGER.error("media_id must be a channel number")
             return
 
-        self._source = "Channel {}".format(media_id)
-        for digit in media_id:
-            await self.send_command("SetChannel", digit, True)
-        self.async_write_ha_state()
+        keys = [("SetChannel", digit, True) for digit in media_id]
+        if self._state == STATE_OFF:
+            keys.insert(0, ("turnOn", None, False))
+
+        def update():
+            if self._state == STATE_OFF:
+                self._state = STATE_IDLE if self.sb.type in IR_TRACK_TYPES else STATE_ON
+            self._source = "Channel {}".format(media_id)
+
+        async def send():
+            with self.async_deadline():
+                await self.sb.async_key_sequence(keys, self._key_gap_ms)
+
+        await self.async_send(send, update)
 
     @callback
     def _async_update_power(self, state):
@@ -232,6 +238,7 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
         self.async_write_ha_state()
 
@@ -249,11 +256,11 @@ class SwitchbotRemoteMediaPlayer(MediaPlayerEntity, RestoreEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes = hass.data[DOMAIN][entry.entry_id]
+    remotes = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_MEDIA_TYPES)
 
     entities = [
         SwitchbotRemoteMediaPlayer(hass, remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_MEDIA_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)
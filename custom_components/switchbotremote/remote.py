@@ -8,13 +8,14 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, STATE_OFF, STATE_ON
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
 from .const import DOMAIN, OTHERS_TYPE, CLASS_BY_TYPE, CONF_POWER_SENSOR, CONF_ON_COMMAND, CONF_OFF_COMMAND
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class SwitchBotRemoteOther(RemoteEntity, RestoreEntity):
+class SwitchBotRemoteOther(SwitchBotRemoteEntity, RemoteEntity, RestoreEntity):
     _attr_has_entity_name = False
 
     def __init__(self, sb: SupportedRemote, options: dict = {}) -> None:
@@ -47,17 +48,17 @@ class SwitchBotRemoteOther(RemoteEntity, RestoreEntity):
         """If the switch is currently on or off."""
         return self._is_on
 
-    def turn_on(self, activity: str = None, **kwargs):
+    async def async_turn_on(self, activity: str = None, **kwargs):
         """Send the power on command."""
         if self._on_command:
-            self.sb.command(self._on_command)
+            await self.send_command(self._on_command)
 
-    def turn_off(self, activity: str = None, **kwargs):
+    async def async_turn_off(self, activity: str = None, **kwargs):
         """Send the power off command."""
         if self._off_command:
-            self.sb.command(self._off_command)
+            await self.send_command(self._off_command)
         elif self._on_command:
-            self.sb.command(self._on_command)
+            await self.send_command(self._on_command)
 
     @callback
     def _async_update_power(self, state):
@@ -74,6 +75,7 @@ class SwitchBotRemoteOther(RemoteEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
 
     async def async_added_to_hass(self):
@@ -90,16 +92,16 @@ class SwitchBotRemoteOther(RemoteEntity, RestoreEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id]
+    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(OTHERS_TYPE)
     entities = []
 
     for remote in remotes:
         options = entry.data.get(remote.id, {})
 
-        if (remote.type == OTHERS_TYPE and options.get("on_command", None)):
+        if (options.get("on_command", None)):
             entities.append(SwitchBotRemoteOther(remote, options))
 
-    _LOGGER.debug(f'Adding remotes {entities}')
+    _LOGGER.debug("Adding remotes %s", entities)
     async_add_entities(entities)
 
     return True
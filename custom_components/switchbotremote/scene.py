@@ -0,0 +1,51 @@
+import logging
+from typing import Any
+from homeassistant.components.scene import Scene
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .client.scene import Scene as CloudScene
+from .entity import SwitchBotRemoteEntity
+from .sensor import account_device_info
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SwitchBotRemoteScene(SwitchBotRemoteEntity, Scene):
+    """Manual scene of the SwitchBot app, run on the cloud side in a single call."""
+
+    _attr_has_entity_name = False
+
+    def __init__(self, entry: ConfigEntry, sb: CloudScene) -> None:
+        super().__init__()
+        self.sb = sb
+        self._entry = entry
+
+    @property
+    def device_info(self):
+        return account_device_info(self._entry)
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self._entry.entry_id}_scene_{self.sb.id}"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this scene."""
+        return self.sb.name
+
+    async def async_activate(self, **kwargs: Any) -> None:
+        """Run the scene."""
+        await self.sb.async_execute()
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
+    # Restored from the saved scene list, see async_reconcile_devices.
+    scenes = hass.data[DOMAIN][entry.entry_id].switchbot.scenes
+
+    _LOGGER.debug(f"Configuring scenes: {scenes}")
+    async_add_entities([SwitchBotRemoteScene(entry, scene) for scene in scenes])
+
+    return True
@@ -0,0 +1,289 @@
+import logging
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
+from .client.breaker import CircuitBreaker, CircuitState
+from .client import SwitchBot
+from .client.concurrency import ConcurrencyLimit
+from .client.dispatcher import HubDispatcher
+from .client.metrics import CallStats
+from .client.ratelimit import RateLimiter
+from .client.remote import Remote
+
+from .const import DOMAIN, CLASS_BY_TYPE, CONF_ON_COMMAND, OTHERS_TYPE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def account_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Device grouping the entities that belong to the SwitchBot account itself."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        manufacturer="SwitchBot",
+        name=entry.data["name"],
+        model="Cloud API Account",
+    )
+
+
+class SwitchBotQuotaSensor(SensorEntity):
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, entry: ConfigEntry, rate_limiter: RateLimiter, key: str, name: str) -> None:
+        super().__init__()
+        self._entry = entry
+        self._rate_limiter = rate_limiter
+        self._key = key
+        self._name = name
+
+    @property
+    def device_info(self):
+        return account_device_info(self._entry)
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self._entry.entry_id}_{self._key}"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this sensor."""
+        return f"{self._entry.data['name']} {self._name}"
+
+    async def async_added_to_hass(self):
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+
+        self.async_on_remove(self._rate_limiter.add_listener(self._async_quota_changed))
+
+    @callback
+    def _async_quota_changed(self):
+        self.async_write_ha_state()
+
+
+class SwitchBotQuotaRemainingSensor(SwitchBotQuotaSensor):
+    _attr_icon = "mdi:api"
+    _attr_native_unit_of_measurement = "calls"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = False
+
+    @property
+    def native_value(self):
+        return self._rate_limiter.remaining
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "used": self._rate_limiter.used,
+            "daily_quota": self._rate_limiter.daily_quota,
+        }
+
+
+class SwitchBotQuotaExhaustionSensor(SwitchBotQuotaSensor):
+    """Time at which the quota runs out at the current pace, unknown if it lasts the day."""
+
+    _attr_icon = "mdi:timer-sand"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    @property
+    def native_value(self):
+        return self._rate_limiter.projected_exhaustion
+
+
+class SwitchBotCircuitSensor(SensorEntity):
+    """State of the circuit breaker guarding the SwitchBot cloud."""
+
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:cloud-check"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [state.value for state in CircuitState]
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry, circuit_breaker: CircuitBreaker) -> None:
+        super().__init__()
+        self._entry = entry
+        self._circuit_breaker = circuit_breaker
+
+    @property
+    def device_info(self):
+        return account_device_info(self._entry)
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self._entry.entry_id}_api_circuit"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this sensor."""
+        return f"{self._entry.data['name']} API Circuit"
+
+    @property
+    def native_value(self):
+        return self._circuit_breaker.state.value
+
+    async def async_added_to_hass(self):
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+
+        self.async_on_remove(self._circuit_breaker.add_listener(self.async_write_ha_state))
+
+
+class SwitchBotQueueSensor(SensorEntity):
+    """Commands waiting for their hub and calls waiting for a slot to reach the SwitchBot cloud,
+    polled as it changes on every call."""
+
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:tray-full"
+    _attr_native_unit_of_measurement = "calls"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, entry: ConfigEntry, concurrency_limit: ConcurrencyLimit, dispatcher: HubDispatcher) -> None:
+        super().__init__()
+        self._entry = entry
+        self._concurrency_limit = concurrency_limit
+        self._dispatcher = dispatcher
+
+    @property
+    def device_info(self):
+        return account_device_info(self._entry)
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self._entry.entry_id}_api_queue"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this sensor."""
+        return f"{self._entry.data['name']} API Queue"
+
+    @property
+    def native_value(self):
+        return self._concurrency_limit.queue_depth + self._dispatcher.queue_depth()
+
+    @property
+    def extra_state_attributes(self):
+        return {**self._concurrency_limit.as_dict(), "hub_queue": self._dispatcher.as_dict()}
+
+
+class SwitchBotApiCallsSensor(SensorEntity):
+    """Calls made to the SwitchBot cloud by the account, with their errors and latencies in total and by hub."""
+
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:counter"
+    _attr_native_unit_of_measurement = "calls"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, entry: ConfigEntry, switchbot: SwitchBot) -> None:
+        super().__init__()
+        self._entry = entry
+        self._switchbot = switchbot
+
+    @property
+    def device_info(self):
+        return account_device_info(self._entry)
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self._entry.entry_id}_api_calls"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this sensor."""
+        return f"{self._entry.data['name']} API Calls"
+
+    @property
+    def native_value(self):
+        return self._switchbot.metrics.account.calls
+
+    @property
+    def extra_state_attributes(self):
+        metrics = self._switchbot.metrics
+        return {
+            **metrics.account.as_dict(),
+            "deduplicated": self._switchbot.dedup.dropped,
+            "hedged": self._switchbot.async_client.hedge_budget.hedged,
+            "hubs": {hub_id: stats.as_dict() for hub_id, stats in metrics.hubs.items()},
+        }
+
+
+class SwitchBotRemoteLatencySensor(SensorEntity):
+    """p95 latency of the commands sent to a remote, with its call, error and retry counts."""
+
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, sb: Remote, stats: CallStats) -> None:
+        super().__init__()
+        self.sb = sb
+        self._stats = stats
+
+    @property
+    def device_info(self):
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.sb.id)},
+            manufacturer="SwitchBot",
+            name=self.sb.name,
+            model=CLASS_BY_TYPE[self.sb.type] + " Remote",
+        )
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"{self.sb.id}_command_latency"
+
+    @property
+    def name(self) -> str:
+        """Return the display name of this sensor."""
+        return f"{self.sb.name} Command Latency"
+
+    @property
+    def native_value(self):
+        return self._stats.percentile_ms(95)
+
+    @property
+    def extra_state_attributes(self):
+        return self._stats.as_dict()
+
+
+def _has_platform_entity(entry: ConfigEntry, remote: Remote) -> bool:
+    """Whether a platform creates the device of `remote`, the latency sensor joins it."""
+    if remote.type == OTHERS_TYPE:
+        return bool(entry.data.get(remote.id, {}).get(CONF_ON_COMMAND))
+    return remote.type in CLASS_BY_TYPE
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
+    data = hass.data[DOMAIN][entry.entry_id]
+    rate_limiter = data.switchbot.async_client.rate_limiter
+    circuit_breaker = data.switchbot.async_client.circuit_breaker
+    concurrency_limit = data.switchbot.async_client.concurrency_limit
+
+    entities = [
+        SwitchBotQuotaRemainingSensor(entry, rate_limiter, "api_quota_remaining", "API Quota Remaining"),
+        SwitchBotQuotaExhaustionSensor(entry, rate_limiter, "api_quota_exhaustion", "API Quota Exhaustion"),
+        SwitchBotCircuitSensor(entry, circuit_breaker),
+        SwitchBotQueueSensor(entry, concurrency_limit, data.switchbot.dispatcher),
+        SwitchBotApiCallsSensor(entry, data.switchbot),
+    ]
+    entities.extend(
+        SwitchBotRemoteLatencySensor(remote, data.switchbot.metrics.remote(remote.id))
+        for remote in data.remotes
+        if _has_platform_entity(entry, remote)
+    )
+
+    async_add_entities(entities)
+
+    return True
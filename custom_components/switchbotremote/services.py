@@ -0,0 +1,113 @@
+"""Services of the SwitchBot Remote IR integration."""
+from __future__ import annotations
+
+import logging
+from functools import partial
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .client.macro import MacroStep, async_run_macro
+from .client.remote import Remote
+from .client.scene import Scene
+from .client.timeouts import deadline
+from .const import CONF_MACROS, DOMAIN, SERVICE_RUN_MACRO
+
+_LOGGER = logging.getLogger(__name__)
+
+MACRO_DELAY = vol.All(vol.Coerce(float), vol.Range(min=0, max=300))
+
+MACRO_STEP_SCHEMA = vol.Any(
+    vol.Schema({
+        vol.Required("remote"): cv.string,
+        vol.Required("command"): cv.string,
+        vol.Optional("parameter"): cv.string,
+        vol.Optional("customize", default=False): cv.boolean,
+        vol.Optional("delay", default=0): MACRO_DELAY,
+    }),
+    # A whole SwitchBot scene, run by the cloud in a single call.
+    vol.Schema({
+        vol.Required("scene"): cv.string,
+        vol.Optional("delay", default=0): MACRO_DELAY,
+    }),
+)
+
+MACRO_STEPS_SCHEMA = vol.All(cv.ensure_list, [MACRO_STEP_SCHEMA])
+
+RUN_MACRO_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Exclusive("macro", "macro"): cv.string,
+        vol.Exclusive("steps", "macro"): MACRO_STEPS_SCHEMA,
+        vol.Optional("timeout"): vol.All(vol.Coerce(float), vol.Range(min=1, max=600)),
+    }),
+    cv.has_at_least_one_key("macro", "steps"),
+)
+
+
+def _loaded_entries(hass: HomeAssistant) -> list:
+    return [entry for entry in hass.config_entries.async_entries(DOMAIN) if entry.entry_id in hass.data.get(DOMAIN, {})]
+
+
+def _find_remote(hass: HomeAssistant, remote: str) -> Remote:
+    """Find a remote of any loaded entry by id, or else by name."""
+    catalogs = [hass.data[DOMAIN][entry.entry_id].switchbot.catalog for entry in _loaded_entries(hass)]
+    for catalog in catalogs:
+        if (found := catalog.get(remote)) is not None:
+            return found
+    for catalog in catalogs:
+        for found in catalog.remotes:
+            if found.name == remote:
+                return found
+
+    raise ServiceValidationError(f"Unknown remote {remote}")
+
+
+def _find_scene(hass: HomeAssistant, scene: str) -> Scene:
+    """Find a scene of any loaded entry by id, or else by name."""
+    scenes = [found for entry in _loaded_entries(hass) for found in hass.data[DOMAIN][entry.entry_id].switchbot.scenes]
+    for found in scenes:
+        if found.id == scene:
+            return found
+    for found in scenes:
+        if found.name == scene:
+            return found
+
+    raise ServiceValidationError(f"Unknown scene {scene}")
+
+
+def _find_macro(hass: HomeAssistant, name: str) -> list[dict]:
+    for entry in _loaded_entries(hass):
+        if (steps := entry.data.get(CONF_MACROS, {}).get(name)) is not None:
+            return MACRO_STEPS_SCHEMA(steps)
+
+    raise ServiceValidationError(f"Unknown macro {name}")
+
+
+async def _async_run_macro(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    steps = call.data["steps"] if "steps" in call.data else _find_macro(hass, call.data["macro"])
+
+    macro = []
+    for step in steps:
+        if "scene" in step:
+            scene = _find_scene(hass, step["scene"])
+            macro.append((scene, MacroStep(scene.id, "execute", delay_s=step["delay"])))
+        else:
+            remote = _find_remote(hass, step["remote"])
+            macro.append((remote, MacroStep(remote.id, step["command"], step.get("parameter"), step["customize"], step["delay"])))
+
+    with deadline(call.data.get("timeout")):
+        return {"steps": await async_run_macro(macro)}
+
+
+def async_setup_services(hass: HomeAssistant):
+    """Register the integration services, shared by every config entry."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RUN_MACRO,
+        partial(_async_run_macro, hass),
+        schema=RUN_MACRO_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
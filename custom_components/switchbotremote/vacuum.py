@@ -9,12 +9,14 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
-from .const import DOMAIN, IR_VACUUM_TYPES, VACUUM_CLASS
+from .const import DOMAIN, IR_VACUUM_TYPES, VACUUM_CLASS, CONF_OPTIMISTIC
 
 
-class SwitchBotRemoteVacuum(StateVacuumEntity, RestoreEntity):
+class SwitchBotRemoteVacuum(SwitchBotRemoteEntity, StateVacuumEntity, RestoreEntity):
     _attr_has_entity_name = False
+    _optimistic_attrs = ("_state",)
 
     def __init__(self, hass: HomeAssistant, sb: SupportedRemote, options: dict = {}):
         super().__init__()
@@ -23,12 +25,10 @@ class SwitchBotRemoteVacuum(StateVacuumEntity, RestoreEntity):
         self._unique_id = sb.id
         self._device_name = sb.name
         self._state = VacuumActivity.IDLE
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
 
         self._supported_features = VacuumEntityFeature.STATE | VacuumEntityFeature.START | VacuumEntityFeature.STOP | VacuumEntityFeature.RETURN_HOME
 
-    async def send_command(self, *args):
-        await self._hass.async_add_executor_job(self.sb.command, *args)
-
     @property
     def device_info(self):
         return DeviceInfo(
@@ -68,26 +68,32 @@ class SwitchBotRemoteVacuum(StateVacuumEntity, RestoreEntity):
 
     async def async_start(self):
         """Send the power on command."""
-        await self.send_command("turnOn")
-        self._state = VacuumActivity.CLEANING
+        def update():
+            self._state = VacuumActivity.CLEANING
+
+        await self.async_send(lambda: self.send_command("turnOn"), update)
 
     async def async_stop(self):
         """Send the power off command."""
-        await self.send_command("turnOff")
-        self._state = STATE_IDLE
+        def update():
+            self._state = VacuumActivity.IDLE
+
+        await self.async_send(lambda: self.send_command("turnOff"), update)
 
     async def async_return_to_base(self):
         """Send the power off command."""
-        await self.send_command("CHARGE", None, True)
-        self._state = STATE_IDLE
+        def update():
+            self._state = VacuumActivity.IDLE
+
+        await self.async_send(lambda: self.send_command("CHARGE", None, True), update)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id]
+    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_VACUUM_TYPES)
 
     entities = [
         SwitchBotRemoteVacuum(hass, remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_VACUUM_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)
@@ -1,4 +1,4 @@
-from .const import DOMAIN, WATER_HEATER_CLASS, IR_WATER_HEATER_TYPES, CONF_POWER_SENSOR, CONF_TEMPERATURE_SENSOR, CONF_TEMP_MAX, CONF_TEMP_MIN
+from .const import DOMAIN, WATER_HEATER_CLASS, IR_WATER_HEATER_TYPES, CONF_POWER_SENSOR, CONF_TEMPERATURE_SENSOR, CONF_TEMP_MAX, CONF_TEMP_MIN, CONF_OPTIMISTIC
 import logging
 from typing import List
 from homeassistant.components.water_heater import WaterHeaterEntity, WaterHeaterEntityFeature, STATE_HEAT_PUMP
@@ -11,6 +11,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, STATE_OFF, STATE_ON
 from homeassistant.const import UnitOfTemperature
 from .client.remote import SupportedRemote
+from .entity import SwitchBotRemoteEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,9 +20,10 @@ DEFAULT_MIN_TEMP = 40
 DEFAULT_MAX_TEMP = 65
 
 
-class SwitchBotRemoteWaterHeater(WaterHeaterEntity, RestoreEntity):
+class SwitchBotRemoteWaterHeater(SwitchBotRemoteEntity, WaterHeaterEntity, RestoreEntity):
     _attr_has_entity_name = False
     _attr_operation_list = [STATE_OFF, STATE_HEAT_PUMP]
+    _optimistic_attrs = ("_state", "_is_on")
 
     def __init__(self, sb: SupportedRemote, options: dict = {}) -> None:
         super().__init__()
@@ -38,6 +40,7 @@ class SwitchBotRemoteWaterHeater(WaterHeaterEntity, RestoreEntity):
         self._temperature_sensor = options.get(CONF_TEMPERATURE_SENSOR, None)
         self._max_temp = options.get(CONF_TEMP_MAX, DEFAULT_MAX_TEMP)
         self._min_temp = options.get(CONF_TEMP_MIN, DEFAULT_MIN_TEMP)
+        self._optimistic = options.get(CONF_OPTIMISTIC, False)
 
     @property
     def device_info(self):
@@ -88,25 +91,29 @@ class SwitchBotRemoteWaterHeater(WaterHeaterEntity, RestoreEntity):
         """Return the min temperature."""
         return self._min_temp
 
-    def turn_on(self, activity: str = None, **kwargs):
+    async def async_turn_on(self, activity: str = None, **kwargs):
         """Send the power on command."""
-        self.sb.command("turnOn")
-        self._state = STATE_HEAT_PUMP
-        self._is_on = True
+        def update():
+            self._state = STATE_HEAT_PUMP
+            self._is_on = True
 
-    def turn_off(self, activity: str = None, **kwargs):
+        await self.async_send(lambda: self.send_command("turnOn"), update)
+
+    async def async_turn_off(self, activity: str = None, **kwargs):
         """Send the power off command."""
-        self.sb.command("turnOff")
-        self._state = STATE_OFF
-        self._is_on = False
+        def update():
+            self._state = STATE_OFF
+            self._is_on = False
+
+        await self.async_send(lambda: self.send_command("turnOff"), update)
 
-    def set_operation_mode(self, operation_mode: str) -> None:
+    async def async_set_operation_mode(self, operation_mode: str) -> None:
         """Set operation mode."""
         if operation_mode == STATE_HEAT_PUMP:
-            self.turn_on()
+            await self.async_turn_on()
 
         if operation_mode == STATE_OFF:
-            self.turn_off()
+            await self.async_turn_off()
 
     @callback
     def _async_update_temp(self, state):
@@ -146,6 +153,7 @@ class SwitchBotRemoteWaterHeater(WaterHeaterEntity, RestoreEntity):
         if new_state is None:
             return
 
+        self.sb.forget_sent_commands()
         self._async_update_power(new_state)
 
     async def async_added_to_hass(self):
@@ -170,11 +178,11 @@ class SwitchBotRemoteWaterHeater(WaterHeaterEntity, RestoreEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> bool:
-    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id]
+    remotes: List[SupportedRemote] = hass.data[DOMAIN][entry.entry_id].switchbot.catalog.by_type(*IR_WATER_HEATER_TYPES)
 
     entities = [
         SwitchBotRemoteWaterHeater(remote, entry.data.get(remote.id, {}))
-        for remote in filter(lambda r: r.type in IR_WATER_HEATER_TYPES, remotes)
+        for remote in remotes
     ]
 
     async_add_entities(entities)